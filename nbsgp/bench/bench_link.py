@@ -0,0 +1,122 @@
+"""Times the link of a synthetic project of static libraries for every linker found (default,gold,lld,mold),
+each with and without split_debug_info. The project is generated with the Ninja generator,one build mode per combination,
+every mode is built once untimed and then only the executable is relinked.
+
+Usage: python bench_link.py [--libs=<libraries>] [--files=<per library>] [--runs=<per mode>] [--jobs=<ninja jobs>] [--dir=<output dir>]"""
+import contextlib
+import importlib.util
+import io
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+NBSGP_FILE = Path(__file__).resolve().parent.parent / "nbsgp" / "nbsgp.py"
+LINKERS = ["gold", "lld", "mold"]
+
+
+def _import_nbsgp():
+    sys.path.insert(0, str(NBSGP_FILE.parent))
+    spec = importlib.util.spec_from_file_location("nbsgp", NBSGP_FILE)
+    nbsgp = importlib.util.module_from_spec(spec)
+    sys.modules["nbsgp"] = nbsgp
+    spec.loader.exec_module(nbsgp)
+    return nbsgp
+
+
+def write_project(root:Path, lib_count:int, files_per_lib:int) -> Path:
+    """Writes project 'Bench',lib_count static libraries of template heavy files (much debug info to link) and
+    the executable 'BenchExe' calling every function of them."""
+    project_dir = root / "Bench"
+    source_dir = project_dir / "source"
+    includes = "".join(f"#include <{name}>\n" for name in ["functional", "map", "sstream", "string", "vector"])
+    for lib_index in range(lib_count):
+        lib = f"Lib{lib_index}"
+        (source_dir / lib / "public").mkdir(parents = True, exist_ok = True)
+        (source_dir / lib / "private").mkdir(parents = True, exist_ok = True)
+        declarations = "".join(f"int lib{lib_index}_f{index}(int x);\n" for index in range(files_per_lib))
+        (source_dir / lib / "public" / f"{lib}.h").write_text(f"#pragma once\nnamespace {lib} {{\n{declarations}}}\n")
+        for index in range(files_per_lib):
+            (source_dir / lib / "private" / f"f{index}.cpp").write_text(
+                f"{includes}namespace {lib} {{\n"
+                f"template<int N> struct S{index} {{ std::map<std::string,std::vector<int>> m; "
+                f"std::string g(int x) {{ std::ostringstream o; o << x << N; m[o.str()].push_back(x); return o.str(); }} }};\n"
+                f"int lib{lib_index}_f{index}(int x) {{ S{index}<1> a; S{index}<2> b; "
+                f"std::function<int(int)> h = [&](int y) {{ return (int)(a.g(y).size() + b.g(y).size()); }}; return h(x); }}\n}}\n")
+        (source_dir / lib / f"{lib}.py").write_text(
+            "from pathlib import Path\nfrom nbsgp_interface import *\n"
+            f'Module = ModuleDefinition(name="{lib}", path=Path(__file__).parent.resolve(), library_type="STATIC",\n'
+            '    private_source=["private"], public_include=["public"])\n')
+    (source_dir / "BenchExe" / "private").mkdir(parents = True, exist_ok = True)
+    calls = "".join(f"    sum += Lib{lib_index}::lib{lib_index}_f{index}(argc);\n"
+                    for lib_index in range(lib_count) for index in range(files_per_lib))
+    headers = "".join(f'#include "Lib{lib_index}.h"\n' for lib_index in range(lib_count))
+    (source_dir / "BenchExe" / "private" / "main.cpp").write_text(
+        f"{headers}int main(int argc, char**) {{\n    int sum = 0;\n{calls}    return sum == 0;\n}}\n")
+    depends = ",\n".join(f'        ModuleDependency(project_name="Bench", module_name="Lib{lib_index}")' for lib_index in range(lib_count))
+    (source_dir / "BenchExe" / "BenchExe.py").write_text(
+        "from pathlib import Path\nfrom nbsgp_interface import *\n"
+        'Module = ModuleDefinition(name="BenchExe", path=Path(__file__).parent.resolve(), library_type="EXECUTABLE",\n'
+        f'    private_source=["private"], private_depends_modules=[\n{depends}\n    ])\n')
+    modules = ",\n".join(f'        load_module(project_root / "source/{name}")'
+                         for name in [f"Lib{lib_index}" for lib_index in range(lib_count)] + ["BenchExe"])
+    (project_dir / "Bench.py").write_text(
+        "from pathlib import Path\nfrom nbsgp import *\nproject_root = Path(__file__).parent.resolve()\n"
+        f'Project = ProjectDefinition(name="Bench", path=project_root, public_modules=[\n{modules}\n    ])\n')
+    return project_dir
+
+
+def get_build_modes() -> list[dict]:
+    """Debug modes for the default linker and every other one on PATH,each without and with split debug info."""
+    linkers = [None] + [linker for linker in LINKERS if shutil.which(f"ld.{linker}") or shutil.which(linker)]
+    modes = []
+    for linker in linkers:
+        for split in (False, True):
+            name = f"{linker or 'default'}{'-split' if split else ''}"
+            modes.append({'name': name, 'mode_path': name, 'cmake_type': "Debug", 'keys': [],
+                          'linker': linker, 'split_debug_info': split})
+    return modes
+
+
+def time_link(build_dir:Path, output:Path, runs:int, jobs:list[str]) -> float:
+    """Builds the mode,then seconds of the fastest of runs relinks of the executable alone."""
+    subprocess.run(["ninja", "-C", str(build_dir), *jobs], check = True, stdout = subprocess.DEVNULL)
+    best = None
+    for _ in range(runs):
+        output.unlink()
+        start = time.perf_counter()
+        subprocess.run(["ninja", "-C", str(build_dir), "Bench::BenchExe"], check = True, stdout = subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv:list[str]):
+    options = dict(arg[2:].split("=", 1) for arg in argv if arg.startswith("--") and "=" in arg)
+    lib_count = int(options.get("libs", 10))
+    files_per_lib = int(options.get("files", 10))
+    runs = int(options.get("runs", 3))
+    jobs = [f"-j{options['jobs']}"] if "jobs" in options else []
+    nbsgp = _import_nbsgp()
+    with contextlib.ExitStack() as stack:
+        root = Path(options["dir"]) if "dir" in options else Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        project_dir = write_project(root.resolve(), lib_count, files_per_lib)
+        modes = get_build_modes()
+        with contextlib.redirect_stdout(io.StringIO()): # definitions log every default they fill in
+            project = nbsgp.load_project(project_dir, use_cache = False)
+            generator = nbsgp.NinjaGenerator(project, modes)
+            generator.generate_makefile()
+        exe = project.from_name_get_module("BenchExe")
+        print(f"{lib_count} libraries x {files_per_lib} files")
+        print(f"{'linker':>8} {'split':>6} {'link s':>8} {'exe MB':>8}")
+        for mode in modes:
+            output = generator._get_output(exe, "EXECUTABLE", mode['mode_path'])
+            elapsed = time_link(generator._get_build_dir(mode['name']), output, runs, jobs)
+            print(f"{mode['linker'] or 'default':>8} {'yes' if mode['split_debug_info'] else 'no':>6} "
+                  f"{elapsed:>8.2f} {output.stat().st_size / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
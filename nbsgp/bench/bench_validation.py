@@ -0,0 +1,76 @@
+"""Times ModuleDefinition._check_dependency_legitimacy over synthetic project graphs of growing size.
+Each project publicly depends on up to 3 earlier projects (a layered DAG),each module depends on modules of its own
+project or of the projects it depends on,so every checked edge is legal. The time per edge should stay flat.
+
+Usage: python bench_validation.py [--modules=<per project>] [--deps=<per module>] [<projects> ...]"""
+import contextlib
+import importlib.util
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+NBSGP_FILE = Path(__file__).resolve().parent.parent / "nbsgp" / "nbsgp.py"
+
+
+def _import_nbsgp():
+    sys.path.insert(0, str(NBSGP_FILE.parent))
+    spec = importlib.util.spec_from_file_location("nbsgp", NBSGP_FILE)
+    nbsgp = importlib.util.module_from_spec(spec)
+    sys.modules["nbsgp"] = nbsgp
+    spec.loader.exec_module(nbsgp)
+    return nbsgp
+
+
+def build_graph(nbsgp, project_count:int, modules_per_project:int, deps_per_module:int, root:Path) -> list:
+    """Builds the projects in memory,no definition files or sources are needed for validation."""
+    rng = random.Random(project_count)
+    projects = []
+    for project_index in range(project_count):
+        depend_indexes = rng.sample(range(project_index), min(project_index, 3))
+        depends = [nbsgp.ProjectDependency(project = projects[index]) for index in depend_indexes]
+        modules = []
+        for module_index in range(modules_per_project):
+            module_depends = []
+            for _ in range(deps_per_module):
+                target = rng.choice([project_index] + depend_indexes)
+                if target == project_index:
+                    if module_index > 0:
+                        module_depends.append(nbsgp.ModuleDependency(module = modules[rng.randrange(module_index)]))
+                else:
+                    module_depends.append(nbsgp.ModuleDependency(module = rng.choice(projects[target].public_modules)))
+            modules.append(nbsgp.ModuleDefinition(name = f"P{project_index}M{module_index}", path = root / f"P{project_index}" / f"M{module_index}",
+                                                  library_type = "STATIC", public_depends_modules = module_depends))
+        projects.append(nbsgp.ProjectDefinition(name = f"P{project_index}", path = root / f"P{project_index}",
+                                                public_modules = modules, public_depends = depends))
+    return projects
+
+
+def time_validation(nbsgp, projects:list) -> float:
+    """Seconds to check every module of the graph,starting from a fresh reachability closure."""
+    nbsgp.project_reachability.reset()
+    start = time.perf_counter()
+    for project in projects:
+        for module in project.public_modules:
+            module._check_dependency_legitimacy()
+    return time.perf_counter() - start
+
+
+def main(argv:list[str]):
+    options = dict(arg[2:].split("=", 1) for arg in argv if arg.startswith("--") and "=" in arg)
+    sizes = [int(arg) for arg in argv if not arg.startswith("--")] or [50, 100, 200, 400]
+    modules_per_project = int(options.get("modules", 20))
+    deps_per_module = int(options.get("deps", 4))
+    nbsgp = _import_nbsgp()
+    print(f"{'projects':>8} {'modules':>8} {'edges':>8} {'check ms':>10} {'us/edge':>8}")
+    for size in sizes:
+        with contextlib.redirect_stdout(io.StringIO()): # definitions log every default they fill in
+            projects = build_graph(nbsgp, size, modules_per_project, deps_per_module, Path("/nbsgp-bench") / str(size))
+            edges = sum(len(module.public_depends_modules) for project in projects for module in project.public_modules)
+            elapsed = min(time_validation(nbsgp, projects) for _ in range(3))
+        print(f"{size:>8} {size * modules_per_project:>8} {edges:>8} {elapsed * 1000:>10.1f} {elapsed * 1e6 / edges:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,34 +1,280 @@
 # -*- coding: utf-8 -*-
 # builder.py
 
-from ast import Global, Set
+import copyreg
+import ctypes
+import ctypes.util
+import importlib.util
 import json
 import os
+import pickle
+import select
+import struct
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import shutil
+import shlex
 import glob
-from turtle import delay
+import fnmatch
+import hashlib
 
 nbsgp_module = sys.modules[__name__]
 sys.modules['nbsgp'] = nbsgp_module
 
-def _find_files(path):
+loaded_definition_files:list[Path] = []
+watched_source_paths:list[Path|str] = []
+
+def _watch_glob_dirs(path_str:str):
+    """Records every directory a glob pattern may match files in, so adding a file there invalidates caches."""
+    base_parts = []
+    for part in Path(path_str).parts:
+        if any(c in part for c in '*?['):
+            break
+        base_parts.append(part)
+    base_dir = Path(*base_parts) if base_parts else Path('.')
+    for root, dirs, files in os.walk(base_dir):
+        watched_source_paths.append(Path(root))
+
+class SourceFilter:
+    """Extension and exclude filter applied to names while source directories are walked,
+    so rejected files never become paths and excluded directories are not descended into.
+    Exclude patterns without a '/' match file or directory names,patterns with a '/' match the path relative to base_dir
+    and never match paths outside of it."""
+    def __init__(self, source_extensions:list[str] = None, exclude:list[str] = None, base_dir:Path|str = None):
+        self.extensions = None
+        if source_extensions is not None:
+            self.extensions = tuple(os.path.normcase(ext if ext.startswith('.') else '.' + ext) for ext in source_extensions)
+        exclude = exclude if exclude is not None else []
+        self.name_patterns = [pattern for pattern in exclude if '/' not in pattern]
+        self.path_patterns = [pattern.strip('/') for pattern in exclude if '/' in pattern]
+        self.base_dir = os.path.normpath(str(base_dir)) if base_dir is not None else None
+
+    def _excluded(self, dir_path:str, name:str) -> bool:
+        for pattern in self.name_patterns:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+        if self.path_patterns and self.base_dir is not None:
+            path = os.path.join(dir_path, name)
+            if not path.startswith(self.base_dir.rstrip(os.sep) + os.sep):
+                return False
+            rel_path = os.path.relpath(path, self.base_dir).replace(os.sep, '/')
+            for pattern in self.path_patterns:
+                if fnmatch.fnmatch(rel_path, pattern):
+                    return True
+        return False
+
+    def accept_dir(self, dir_path:str, name:str) -> bool:
+        return not self._excluded(dir_path, name)
+
+    def accept_file(self, dir_path:str, name:str) -> bool:
+        if self.extensions is not None and not os.path.normcase(name).endswith(self.extensions):
+            return False
+        return not self._excluded(dir_path, name)
+
+    def accept_path(self, file_path:str) -> bool:
+        """Checks a file found without walking,such as a glob.glob result,including every directory below base_dir."""
+        dir_path, name = os.path.split(os.path.normpath(file_path))
+        if not self.accept_file(dir_path, name):
+            return False
+        while self.base_dir is not None and len(dir_path) > len(self.base_dir) and dir_path.startswith(self.base_dir + os.sep):
+            dir_path, name = os.path.split(dir_path)
+            if not self.accept_dir(dir_path, name):
+                return False
+        return True
+
+source_index_file_name = "nbsgp_source_index.pickle"
+# Directories modified this recently may still change within the same mtime tick,so their listing is not trusted later
+source_index_racy_window_ns = 2 * 1000 * 1000 * 1000
+
+class SourceDirectoryIndex:
+    """Persistent listing of source directories,stored in a project's cache_dir.
+    A directory is only listed again when its mtime changed,unchanged subtrees are served from the index."""
+    def __init__(self, index_file:Path = None):
+        self.index_file = index_file
+        self.entries:dict[str,tuple[int,list[str],list[str]]] = {}
+        self.changed = False
+        if index_file is not None and index_file.is_file():
+            try:
+                with open(index_file, "rb") as f:
+                    self.entries = pickle.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read source index {index_file},rescanning all directories: {e}")
+                self.entries = {}
+
+    def list_dir(self, dir_path:str) -> tuple[list[str],list[str]]:
+        """Returns the (files, sub directories) names of a directory."""
+        mtime = os.stat(dir_path).st_mtime_ns
+        entry = self.entries.get(dir_path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1], entry[2]
+        files:list[str] = []
+        dirs:list[str] = []
+        with os.scandir(dir_path) as it:
+            for dir_entry in it:
+                if dir_entry.is_dir():
+                    dirs.append(dir_entry.name)
+                else:
+                    files.append(dir_entry.name)
+        stored_mtime = mtime if time.time_ns() - mtime > source_index_racy_window_ns else None
+        self.entries[dir_path] = (stored_mtime, files, dirs)
+        self.changed = True
+        return files, dirs
+
+    def walk(self, root:Path|str, source_filter:SourceFilter = None) -> list[str]:
+        """Lists every file below root,in the same order as os.walk.
+        Files are returned as plain path strings,building a Path for each of them costs more than the listing."""
+        found_files:list[str] = []
+        pending_dirs = [str(root)]
+        while pending_dirs:
+            dir_path = pending_dirs.pop()
+            watched_source_paths.append(dir_path)
+            files, dirs = self.list_dir(dir_path)
+            if source_filter is not None:
+                files = [file for file in files if source_filter.accept_file(dir_path, file)]
+                dirs = [sub_dir for sub_dir in dirs if source_filter.accept_dir(dir_path, sub_dir)]
+            found_files.extend(os.path.join(dir_path, file) for file in files)
+            pending_dirs.extend(os.path.join(dir_path, sub_dir) for sub_dir in reversed(dirs))
+        return found_files
+
+    def save(self):
+        if not self.changed or self.index_file is None:
+            return
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+            with open(temp_file, "wb") as f:
+                pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.index_file)
+            self.changed = False
+        except Exception as e:
+            print(f"Warning: Could not save source index {self.index_file}: {e}")
+
+source_indexes:dict[str,SourceDirectoryIndex] = {}
+_source_indexes_lock = threading.Lock()
+
+def get_source_index(cache_dir:Path|str) -> SourceDirectoryIndex:
+    """Returns the shared source index stored in cache_dir,None cache_dir gives an index that is never saved."""
+    if cache_dir is None:
+        return SourceDirectoryIndex()
+    with _source_indexes_lock:
+        index = source_indexes.get(str(cache_dir))
+        if index is None:
+            index = source_indexes[str(cache_dir)] = SourceDirectoryIndex(Path(cache_dir) / source_index_file_name)
+        return index
+
+def save_source_indexes():
+    for index in source_indexes.values():
+        index.save()
+
+artifact_manifest_file_name = "nbsgp_artifacts.json"
+
+class ArtifactStore:
+    """Writes generated files only when their content changed,so an unchanged CMakeLists.txt keeps its mtime
+    and does not make CMake configure again. Changed files are written atomically,content hashes are kept in
+    a manifest so an unchanged file is recognised by its stamp without reading it back."""
+    def __init__(self, manifest_file:Path = None):
+        self.manifest_file = manifest_file
+        self.entries:dict[str,dict[str,any]] = {}
+        self.changed = False
+        self.lock = threading.Lock()
+        if manifest_file is not None and manifest_file.is_file():
+            try:
+                with open(manifest_file, "r", encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read artifact manifest {manifest_file},comparing generated files by content: {e}")
+                self.entries = {}
+
+    @staticmethod
+    def _hash(data:bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def write(self, path:Path|str, content:str) -> bool:
+        """Writes content as a text file would be written,returns False when the file already held it."""
+        path_str = str(path)
+        data = content.replace("\n", os.linesep).encode('utf-8')
+        digest = self._hash(data)
+        with self.lock:
+            entry = self.entries.get(path_str)
+        stamp = _stat_stamp(path_str)
+        if entry is not None and entry["hash"] == digest and entry["stamp"] == stamp:
+            return False
+        if stamp is not None and stamp[1] == len(data):
+            with open(path_str, "rb") as f:
+                unchanged = self._hash(f.read()) == digest
+        else:
+            unchanged = False
+        if not unchanged:
+            temp_file = path_str + ".tmp"
+            with open(temp_file, "wb") as f:
+                f.write(data)
+            os.replace(temp_file, path_str)
+            stamp = _stat_stamp(path_str)
+        with self.lock:
+            self.entries[path_str] = {"hash": digest, "stamp": stamp}
+            self.changed = True
+        return not unchanged
+
+    def save(self):
+        if not self.changed or self.manifest_file is None:
+            return
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+            with open(temp_file, "w", encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(temp_file, self.manifest_file)
+            self.changed = False
+        except Exception as e:
+            print(f"Warning: Could not save artifact manifest {self.manifest_file}: {e}")
+
+artifact_stores:dict[str,ArtifactStore] = {}
+_artifact_stores_lock = threading.Lock()
+
+def get_artifact_store(cache_dir:Path|str) -> ArtifactStore:
+    """Returns the shared artifact store whose manifest lives in cache_dir,None cache_dir gives a store without manifest."""
+    if cache_dir is None:
+        return ArtifactStore()
+    with _artifact_stores_lock:
+        store = artifact_stores.get(str(cache_dir))
+        if store is None:
+            store = artifact_stores[str(cache_dir)] = ArtifactStore(Path(cache_dir) / artifact_manifest_file_name)
+        return store
+
+def save_artifact_stores():
+    for store in artifact_stores.values():
+        store.save()
+
+def _find_files(path, index:SourceDirectoryIndex = None, source_filter:SourceFilter = None):
     p = Path(path)
     path_str = str(path)
 
     if any(c in path_str for c in '*?['):
-        found_paths = [Path(p) for p in glob.glob(path_str, recursive=True)]
+        _watch_glob_dirs(path_str)
+        found_names = glob.glob(path_str, recursive=True)
+        if source_filter is not None:
+            found_names = [name for name in found_names if source_filter.accept_path(name)]
+        found_paths = [Path(p) for p in found_names]
         
         return [p for p in found_paths if p.is_file()]
     
-    if path.is_file():
-        return [path]
+    if p.is_file():
+        watched_source_paths.append(p)
+        return [p]
     
-    if path.is_dir():
+    if p.is_dir():
+        if index is not None:
+            return index.walk(p, source_filter)
         found_files = []
-        for root, dirs, files in os.walk(path):
+        for root, dirs, files in os.walk(p):
+            watched_source_paths.append(Path(root))
+            if source_filter is not None:
+                dirs[:] = [sub_dir for sub_dir in dirs if source_filter.accept_dir(root, sub_dir)]
+                files = [file for file in files if source_filter.accept_file(root, file)]
             for file in files:
                 file_path = Path(root) / file
                 found_files.append(file_path)
@@ -36,6 +282,156 @@ def _find_files(path):
     raise AttributeError(f"Try find files in {path},but not found")
     return []
 
+class ProjectSourceSnapshot:
+    """One os.scandir walk of a project's tree,shared by every module of the project.
+    Directory and glob source entries are answered from memory,so overlapping entries such as 'private'
+    and 'private/*.cpp' never walk the disk twice. Output directories,sub-projects and hidden directories
+    are left out of the walk and only scanned if an entry actually points into them,as are directories prune_filter rejects."""
+    def __init__(self, root:Path|str, index:SourceDirectoryIndex, skip_dirs:list[Path|str] = None, max_workers:int = None,
+                 prune_filter:SourceFilter = None):
+        self.root = os.path.normpath(str(root))
+        self.index = index
+        self.skip_keys = {self._key(p) for p in (skip_dirs or []) if p is not None}
+        self.prune_filter = prune_filter
+        self.dirs:dict[str,tuple[str,list[str],list[str]]] = {}
+        self._scan(max_workers)
+
+    @staticmethod
+    def _key(path:Path|str) -> str:
+        return os.path.normcase(os.path.normpath(str(path)))
+
+    def _is_skipped(self, dir_path:str, sub_dir:str) -> bool:
+        if sub_dir.startswith('.') or self._key(os.path.join(dir_path, sub_dir)) in self.skip_keys:
+            return True
+        return self.prune_filter is not None and not self.prune_filter.accept_dir(dir_path, sub_dir)
+
+    def _scan_tree(self, top:str, skip:bool = True) -> dict[str,tuple[str,list[str],list[str]]]:
+        found = {}
+        pending_dirs = [top]
+        while pending_dirs:
+            dir_path = pending_dirs.pop()
+            try:
+                files, dirs = self.index.list_dir(dir_path)
+            except OSError:
+                continue
+            found[self._key(dir_path)] = (dir_path, files, dirs)
+            for sub_dir in reversed(dirs):
+                sub_path = os.path.join(dir_path, sub_dir)
+                if skip and self._is_skipped(dir_path, sub_dir):
+                    continue
+                pending_dirs.append(sub_path)
+        return found
+
+    def _scan(self, max_workers:int = None):
+        root_files, root_dirs = self.index.list_dir(self.root)
+        self.dirs[self._key(self.root)] = (self.root, root_files, root_dirs)
+        top_dirs = [os.path.join(self.root, d) for d in root_dirs if not self._is_skipped(self.root, d)]
+        if len(top_dirs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for found in executor.map(self._scan_tree, top_dirs):
+                    self.dirs.update(found)
+        else:
+            for top_dir in top_dirs:
+                self.dirs.update(self._scan_tree(top_dir))
+
+    def _get_dir(self, dir_path:str) -> tuple[str,list[str],list[str]]:
+        key = self._key(dir_path)
+        entry = self.dirs.get(key)
+        if entry is None and os.path.isdir(dir_path):
+            # A directory left out of the initial walk,scan it completely now
+            self.dirs.update(self._scan_tree(dir_path, skip=False))
+            entry = self.dirs.get(key)
+        return entry
+
+    def refresh(self, dir_path:Path|str):
+        """Lists one changed directory again and forgets the subtrees of sub directories that are gone."""
+        dir_path = os.path.normpath(str(dir_path))
+        key = self._key(dir_path)
+        self.dirs.pop(key, None)
+        sub_dir_keys = set()
+        if os.path.isdir(dir_path):
+            files, dirs = self.index.list_dir(dir_path)
+            self.dirs[key] = (dir_path, files, dirs)
+            sub_dir_keys = {os.path.normcase(d) for d in dirs}
+        prefix = key.rstrip(os.sep) + os.sep
+        for stale_key in [k for k in self.dirs if k.startswith(prefix) and k[len(prefix):].split(os.sep)[0] not in sub_dir_keys]:
+            del self.dirs[stale_key]
+
+    def _collect_files(self, dir_path:str, found_files:list[str], source_filter:SourceFilter = None):
+        pending_dirs = [dir_path]
+        while pending_dirs:
+            entry = self._get_dir(pending_dirs.pop())
+            if entry is None:
+                continue
+            real_dir, files, dirs = entry
+            watched_source_paths.append(real_dir)
+            if source_filter is not None:
+                files = [file for file in files if source_filter.accept_file(real_dir, file)]
+                dirs = [sub_dir for sub_dir in dirs if source_filter.accept_dir(real_dir, sub_dir)]
+            found_files.extend(os.path.join(real_dir, file) for file in files)
+            pending_dirs.extend(os.path.join(real_dir, sub_dir) for sub_dir in reversed(dirs))
+
+    def _glob(self, dir_path:str, parts:list[str], found_files:list[str], source_filter:SourceFilter = None):
+        """Matches glob.glob(recursive=True) semantics,keeping files only."""
+        entry = self._get_dir(dir_path)
+        if entry is None:
+            return
+        real_dir, files, dirs = entry
+        watched_source_paths.append(real_dir)
+        if source_filter is not None:
+            files = [file for file in files if source_filter.accept_file(real_dir, file)]
+            dirs = [sub_dir for sub_dir in dirs if source_filter.accept_dir(real_dir, sub_dir)]
+        part, rest = parts[0], parts[1:]
+        if part == "**":
+            if rest:
+                self._glob(real_dir, rest, found_files, source_filter)
+            else:
+                found_files.extend(os.path.join(real_dir, f) for f in files if not f.startswith('.'))
+            for sub_dir in dirs:
+                if not sub_dir.startswith('.'):
+                    self._glob(os.path.join(real_dir, sub_dir), parts, found_files, source_filter)
+            return
+        if not any(c in part for c in '*?['):
+            names = dirs if rest else files
+            if os.path.normcase(part) in (os.path.normcase(n) for n in names):
+                if rest:
+                    self._glob(os.path.join(real_dir, part), rest, found_files, source_filter)
+                else:
+                    found_files.append(os.path.join(real_dir, part))
+            return
+        include_hidden = part.startswith('.')
+        for name in (dirs if rest else files):
+            if (include_hidden or not name.startswith('.')) and fnmatch.fnmatch(name, part):
+                if rest:
+                    self._glob(os.path.join(real_dir, name), rest, found_files, source_filter)
+                else:
+                    found_files.append(os.path.join(real_dir, name))
+
+    def find_files(self, path:Path|str, source_filter:SourceFilter = None) -> list[Path|str]:
+        """Same results as _find_files,answered from the snapshot when path lies inside the project tree."""
+        path_str = os.path.normpath(str(path))
+        try:
+            rel_path = os.path.relpath(path_str, self.root)
+        except ValueError:
+            return _find_files(Path(path), self.index, source_filter)
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+            return _find_files(Path(path), self.index, source_filter)
+
+        found_files:list[str] = []
+        if any(c in path_str for c in '*?['):
+            if rel_path == '.':
+                return found_files
+            self._glob(self.root, rel_path.split(os.sep), found_files, source_filter)
+            return found_files
+        if self._get_dir(path_str) is not None:
+            self._collect_files(path_str, found_files, source_filter)
+            return found_files
+        parent_entry = self._get_dir(os.path.dirname(path_str))
+        if parent_entry is not None and os.path.basename(path_str) in parent_entry[1]:
+            watched_source_paths.append(path_str)
+            return [Path(path)]
+        raise AttributeError(f"Try find files in {path},but not found")
+
 # --- Helper Functions ---
 def _load_definition(file_path: Path, definition_name: str, class_type: str):
     """
@@ -51,13 +447,16 @@ def _load_definition(file_path: Path, definition_name: str, class_type: str):
         Exception: For other loading errors.
     """
     file_stem = file_path.stem
-    sys.path.insert(0, str(file_path.parent))
+    loaded_definition_files.append(file_path)
+    parent_path = str(file_path.parent)
+    sys.path.insert(0, parent_path)
     try:
-        if file_stem in sys.modules:
-            import importlib
-            definition_module = importlib.reload(sys.modules[file_stem])
-        else:
-            definition_module = __import__(file_stem)
+        # Load by file location rather than by name: projects may be loaded from several threads at once,
+        # so sys.path[0] is not guaranteed to be this file's directory while the import runs
+        spec = importlib.util.spec_from_file_location(file_stem, file_path)
+        definition_module = importlib.util.module_from_spec(spec)
+        sys.modules[file_stem] = definition_module
+        spec.loader.exec_module(definition_module)
         
         if hasattr(definition_module, definition_name):
             definition_obj = getattr(definition_module, definition_name)
@@ -76,7 +475,55 @@ def _load_definition(file_path: Path, definition_name: str, class_type: str):
         print(f"Error loading {class_type} definition from {file_path}: {e}")
         raise
     finally:
-        sys.path.pop(0)
+        sys.path.remove(parent_path)
+        
+class KeyTable:
+    """Workspace wide table of condition and required keys,every key is interned once and owns one bit.
+    Definitions keep their keys as an int mask,so subset and intersection checks are single bitwise operations."""
+    def __init__(self):
+        self.bits:dict[str,int] = {}
+        self.lock = threading.Lock()
+        self.install_always_mask = self.get_mask(["InstallAlways"])
+
+    def get_mask(self, keys:list[str]) -> int:
+        mask = 0
+        for key in keys:
+            bit = self.bits.get(key)
+            if bit is None:
+                with self.lock:
+                    bit = self.bits.setdefault(key, 1 << len(self.bits))
+            mask |= bit
+        return mask
+
+    def get_keys(self, mask:int) -> list[str]:
+        return [key for key, bit in self.bits.items() if mask & bit]
+
+    def restore(self, bits:dict[str,int]) -> bool:
+        """Adopts the table a cached graph was masked with,fails if a key interned since then owns another bit there."""
+        with self.lock:
+            if any(bits.get(key) != bit for key, bit in self.bits.items()):
+                return False
+            self.bits.update(bits)
+        return True
+
+key_table = KeyTable()
+
+generation_keys_filter:list[str] = None
+generation_keys_mask:int = None # generation_keys_filter interned in key_table
+# Loading options of the command line,repeated by generated files that run nbsgp again (ninja's regenerate rule)
+generation_load_options:list[str] = []
+
+def _keys_intersection(required_mask:int, activated_mask:int) -> bool:
+    """Python side of check_keys_intersection in the generated CMakeLists.txt."""
+    if required_mask == key_table.install_always_mask:
+        return True
+    return bool(required_mask & activated_mask)
+
+def _is_generation_active(required_mask:int) -> bool:
+    """False when a --keys filter is set and none of the required keys is in it."""
+    if generation_keys_mask is None:
+        return True
+    return _keys_intersection(required_mask, generation_keys_mask)
         
 class ExternalModuleDefinitionBase:
     def __init__(self, name: str = None, path: Path|str = None): 
@@ -119,6 +566,9 @@ class ExternalModuleDefinitionBase:
     def get_condition_keys(self) -> list[str]:
         return None
     
+    def get_condition_mask(self) -> int:
+        return 0
+    
     def get_library_name(self)->str:
         return None
 
@@ -173,13 +623,16 @@ class ExternalProjectDefinitionBase:
     def get_condition_keys(self) -> list[str]:
         return None
     
+    def get_condition_mask(self) -> int:
+        return 0
+    
     def get_modules(self) -> list[ExternalModuleDefinitionBase]:
         return None
     
     def from_name_get_module(self,module_name:str) -> ExternalModuleDefinitionBase:
         moudles = self.get_modules()
         for i in moudles:
-            if i.get_name() is module_name:
+            if i.get_name() == module_name:
                 return i
         return None
     
@@ -191,6 +644,7 @@ class ExternalModuleDependencyBase:
     def __init__(self, module: ExternalModuleDefinitionBase = None, required_keys: list[str] = None):
         self.module = module
         self.required_keys = required_keys if required_keys is not None else ["InstallAlways"]
+        self.required_mask = key_table.get_mask(self.required_keys)
     def _init_real(self):
         return
 
@@ -198,6 +652,7 @@ class ExternalProjectDependencyBase:
     def __init__(self, project: ExternalProjectDefinitionBase = None, required_keys: list[str] = None,use_relative_path:bool = True):
         self.project = project
         self.required_keys = required_keys if required_keys is not None else ["InstallAlways"]
+        self.required_mask = key_table.get_mask(self.required_keys)
         self.use_relative_path = use_relative_path
     def _init_real(self):
         return
@@ -252,6 +707,9 @@ class ModuleDefinitionBase:
     def get_condition_keys(self) -> list[str]:
         return None
     
+    def get_condition_mask(self) -> int:
+        return 0
+    
     def get_library_type(self)->str:
         return None
         
@@ -288,6 +746,46 @@ class ModuleDefinitionBase:
     def get_owner_project(self):
         return None
     
+    def get_source_extensions(self) -> list[str]:
+        return None
+    
+    def get_exclude(self) -> list[str]:
+        return None
+    
+    def get_public_source_entries(self) -> list[Path]:
+        """Absolute source entries as declared,before directories and globs are expanded."""
+        return None
+    
+    def get_private_source_entries(self) -> list[Path]:
+        return None
+    
+    def get_source_entries(self) -> list[Path]:
+        return None
+    
+    def get_glob_sources(self) -> bool:
+        return False
+    
+    def get_source_filter(self) -> SourceFilter:
+        return None
+    
+    def get_unity_build(self) -> bool:
+        return False
+    
+    def get_unity_batch_size(self) -> int:
+        return None
+    
+    def get_unity_exclude(self) -> list[str]:
+        return None
+    
+    def get_public_pch(self) -> list[Path|str]:
+        return None
+    
+    def get_private_pch(self) -> list[Path|str]:
+        return None
+    
+    def get_pch_reuse_from(self) -> 'ModuleDependencyBase':
+        return None
+    
 class ProjectDefinitionBase:
     def __init__(self, name: str = None, path: Path|str = None): 
         if name is None:
@@ -327,6 +825,9 @@ class ProjectDefinitionBase:
     def get_condition_keys(self) -> list[str]:
         return None
     
+    def get_condition_mask(self) -> int:
+        return 0
+    
     def get_binarys_dir(self) -> Path:
         return None
     
@@ -339,6 +840,33 @@ class ProjectDefinitionBase:
     def get_install_dir(self) -> Path:
         return None
     
+    def get_source_snapshot(self) -> ProjectSourceSnapshot:
+        return None
+    
+    def get_source_extensions(self) -> list[str]:
+        return None
+    
+    def get_exclude(self) -> list[str]:
+        return None
+    
+    def get_glob_sources(self) -> bool:
+        return False
+    
+    def get_reduce_link_edges(self) -> bool:
+        return False
+    
+    def get_resolve_keys(self) -> bool:
+        return False
+    
+    def get_module_fragments(self) -> bool:
+        return False
+    
+    def get_unity_build(self) -> bool:
+        return False
+    
+    def get_unity_batch_size(self) -> int:
+        return None
+    
     def get_should_install(self) ->bool:
         return True
     
@@ -357,7 +885,7 @@ class ProjectDefinitionBase:
     def from_name_get_public_module(self,module_name:str) -> ModuleDefinitionBase:
         moudles = self.get_public_modules()
         for i in moudles:
-            if i.get_name() is module_name:
+            if i.get_name() == module_name:
                 return i
         return None
     
@@ -367,15 +895,17 @@ class ProjectDefinitionBase:
     def from_name_get_private_module(self,module_name:str) -> ModuleDefinitionBase:
         moudles = self.get_private_modules()
         for i in moudles:
-            if i.get_name() is module_name:
+            if i.get_name() == module_name:
                 return i
         return None
     
     def from_name_get_module(self,module_name:str) -> ModuleDefinitionBase:
         moudles = self.get_private_modules() + self.get_public_modules()
         for i in moudles:
-            if i.get_name() is module_name:
+            if i.get_name() == module_name:
                 return i
+        if _resolve_provisional_modules(moudles):
+            return self.from_name_get_module(module_name)
         return None
 
     def get_public_depends(self):#not include inherit from depends
@@ -398,6 +928,7 @@ class ModuleDependencyBase:
     def __init__(self, module: ModuleDefinitionBase = None, required_keys: list[str] = None):
         self.module = module
         self.required_keys = required_keys if required_keys is not None else ["InstallAlways"]
+        self.required_mask = key_table.get_mask(self.required_keys)
     def _init_real(self):
         return
 
@@ -405,6 +936,7 @@ class ProjectDependencyBase:
     def __init__(self, project: ProjectDefinitionBase = None, required_keys: list[str] = None,use_relative_path:bool = True):
         self.project = project
         self.required_keys = required_keys if required_keys is not None else ["InstallAlways"]
+        self.required_mask = key_table.get_mask(self.required_keys)
         self.use_relative_path = use_relative_path
     def _init_real(self):
         return
@@ -426,15 +958,197 @@ class MakefileGeneratorBase:
     def generate_makefile(self):
         raise NotImplementedError
 
+    def generate_cmakelists(self):
+        """Rewrites only the project's build description,used by watch mode. Defaults to a full generation."""
+        self.generate_makefile()
+
     def clean_makefile(self):
         raise NotImplementedError
 
+def _cmake_source_glob(entry:Path|str) -> tuple[str,str]:
+    """Maps a directory or glob source entry to an equivalent CMake (file command, pattern),
+    None when the entry is a single file or a pattern CMake globbing cannot express."""
+    entry_str = os.path.normpath(str(entry))
+    parts = entry_str.split(os.sep)
+    magic_parts = [i for i, part in enumerate(parts) if any(c in part for c in '*?[')]
+    last = len(parts) - 1
+    if not magic_parts:
+        return ("GLOB_RECURSE", os.path.join(entry_str, "*")) if os.path.isdir(entry_str) else None
+    if magic_parts == [last] and "**" not in parts[last]:
+        return ("GLOB", entry_str)
+    if magic_parts == [last - 1, last] and parts[last - 1] == "**" and "**" not in parts[last]:
+        # 'dir/**/name' matches name in dir and every sub directory,which is what GLOB_RECURSE 'dir/name' does
+        return ("GLOB_RECURSE", os.sep.join(parts[:-2] + [parts[last]]))
+    return None
+
+def _fnmatch_to_cmake_regex(pattern:str) -> str:
+    """Translates an fnmatch pattern into a CMake regex,escaped for a quoted CMake argument."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '*':
+            regex.append("[^/]*")
+        elif c == '?':
+            regex.append("[^/]")
+        elif c == '[' and pattern.find(']', i + 2) != -1:
+            end = pattern.find(']', i + 2)
+            inner = pattern[i + 1:end]
+            regex.append("[" + ("^" + inner[1:] if inner.startswith('!') else inner) + "]")
+            i = end
+        elif c in '.+()^$|\\{}[]':
+            regex.append("\\\\" + c)
+        else:
+            regex.append(c)
+        i += 1
+    return "".join(regex)
+
+module_fragment_dir_name = "cmake"
+module_fragment_cache_file_name = "nbsgp_fragments.json"
+module_fragment_format = 1 # bump when the emitted module block changes shape
+
+def _get_unity_excluded_files(module:ModuleDefinitionBase) -> list[Path]:
+    """Sources of a unity build module matched by its unity_exclude patterns,sorted."""
+    if not module.get_unity_exclude():
+        return []
+    unity_filter = SourceFilter(None, module.get_unity_exclude(), module.get_path())
+    sources = (module.get_public_source_files() or []) + (module.get_private_source_files() or [])
+    return sorted({Path(path) for path in sources if not unity_filter.accept_path(str(path))})
+
+compiler_cache_dir_name = "compiler_cache"
+
+def _get_compiler_cache_dir(project:ProjectDefinitionBase) -> Path:
+    """Where a build mode's compiler launcher keeps its cache by default."""
+    return Path(project.get_cache_dir() if project.get_cache_dir() is not None else Path(project.get_path()) / default_cache_dir) / compiler_cache_dir_name
+
+def _get_compiler_base_dir(project:ProjectDefinitionBase) -> Path:
+    """Common directory of every project the project builds with,compiler caches rewrite paths below it to relative ones.
+    None when the projects share no directory."""
+    paths = [str(p.get_path()) for p in build_project_dependency_graph(project).nodes]
+    try:
+        return Path(os.path.commonpath(paths))
+    except ValueError: # different drives
+        return None
+
+pgo_dir_name = "pgo"
+default_pgo_profile = "default"
+pgo_phases = ("generate", "use")
+
+def _get_pgo_phase(mode:dict) -> str:
+    """'generate' for an instrumented build mode,'use' for one optimized with the trained profile,None without pgo."""
+    phase = mode.get('pgo')
+    if not phase:
+        return None
+    if str(phase).lower() not in pgo_phases:
+        raise ValueError(f"Build mode '{mode.get('name')}' has unknow pgo phase '{phase}',use one of {', '.join(pgo_phases)}")
+    return str(phase).lower()
+
+def _get_pgo_dir(project:ProjectDefinitionBase, mode:dict) -> Path:
+    """Where the profile data of a pgo build mode is written and read,the modes sharing a pgo_profile share it."""
+    return Path(project.get_cache_dir() if project.get_cache_dir() is not None else Path(project.get_path()) / default_cache_dir) / \
+        pgo_dir_name / (mode.get('pgo_profile') or default_pgo_profile)
+
+def train_pgo_profiles(project:ProjectDefinitionBase, mode_names:list[str] = None, reset:bool = False) -> bool:
+    """Runs the pgo_train commands of the project's instrumented build modes (built before) in the project directory,
+    then merges the raw profiles clang writes into the default.profdata its use modes read,gcc's .gcda files are read as they are.
+    With reset the profile data of earlier runs is deleted first. Returns False when a step failed."""
+    modes = [mode for mode in _get_build_modes(project) if _get_pgo_phase(mode) == "generate"
+             and (mode_names is None or mode.get('name') in mode_names)]
+    if not modes:
+        print(f"Warning: Project '{project.get_name()}' has no instrumented build mode (pgo 'generate') to train")
+        return False
+    projects = build_project_dependency_graph(project).nodes
+    succeeded = True
+    for mode in modes:
+        # Every project of the graph was compiled with its own profile dir,profiles of libraries land there
+        pgo_dirs = list(dict.fromkeys(_get_pgo_dir(p, mode) for p in projects))
+        if reset:
+            for pgo_dir in pgo_dirs:
+                for path in [*pgo_dir.glob("*.gcda"), *pgo_dir.glob("*.profraw"), *pgo_dir.glob("*.profdata")]:
+                    path.unlink()
+        if not mode.get('pgo_train'):
+            print(f"Warning: Build mode '{mode.get('name')}' has no pgo_train commands,only merging existing profiles")
+        for command in mode.get('pgo_train') or []:
+            args = shlex.split(command) if isinstance(command, str) else [str(arg) for arg in command]
+            print(f"Training {mode.get('name')}: {' '.join(args)}")
+            try:
+                returncode = subprocess.run(args, cwd = project.get_path()).returncode
+            except OSError as e:
+                print(f"Warning: Could not run training command '{' '.join(args)}' : {e}")
+                succeeded = False
+                continue
+            if returncode != 0:
+                print(f"Warning: Training command '{' '.join(args)}' exited with {returncode}")
+                succeeded = False
+        raw_profiles = [path for pgo_dir in pgo_dirs for path in sorted(pgo_dir.glob("*.profraw"))]
+        if not raw_profiles:
+            continue
+        profdata_tool = shutil.which("llvm-profdata")
+        if profdata_tool is None:
+            print(f"Warning: llvm-profdata not found,could not merge the {len(raw_profiles)} raw profiles of build mode '{mode.get('name')}'")
+            succeeded = False
+            continue
+        merged = pgo_dirs[0] / "default.profdata"
+        if subprocess.run([profdata_tool, "merge", f"-output={merged}", *raw_profiles]).returncode != 0:
+            print(f"Warning: Merging the raw profiles of build mode '{mode.get('name')}' failed")
+            succeeded = False
+            continue
+        for pgo_dir in pgo_dirs[1:]:
+            pgo_dir.mkdir(parents = True, exist_ok = True)
+            shutil.copyfile(merged, pgo_dir / "default.profdata")
+        print(f"Merged {len(raw_profiles)} raw profiles into {merged}")
+    return succeeded
+
+def _get_compile_macros(module:ModuleDefinitionBase, is_active) -> set[str]:
+    """Definitions the sources of a module are compiled with,as the CMakeLists.txt emits them:
+    its own macros and the public ones of all its depends,private depends included as they are linked PUBLIC."""
+    macros = set(module.get_private_macros() + module.get_owner_project().get_private_macros()) if module.get_private_macros() else set()
+    pending = [module]
+    seen = {id(module)}
+    while pending:
+        current = pending.pop()
+        if current.get_public_macros():
+            macros.update(current.get_public_macros() + current.get_owner_project().get_public_macros())
+        for dep in (current.get_public_depends_modules() or []) + (current.get_private_depends_modules() or []):
+            if is_active(dep.required_mask) and id(dep.module) not in seen:
+                seen.add(id(dep.module))
+                pending.append(dep.module)
+    return macros
+
+def _get_pch_reuse_problem(module:ModuleDefinitionBase, reuse_module:ModuleDefinitionBase, is_active) -> str:
+    """Why module can not use the precompiled header of reuse_module,None when it can."""
+    if module.get_owner_project() is not reuse_module.get_owner_project():
+        return "it belongs to another project"
+    if reuse_module.get_pch_reuse_from() is not None:
+        return "it reuses another precompiled header itself"
+    shared_types = ("DYNAMICLIBRARY", "DYNAMIC", "DLL", "SHARED")
+    if (module.get_library_type().upper() in shared_types) != (reuse_module.get_library_type().upper() in shared_types):
+        return "only one of them is a shared library built as position independent code"
+    macros = _get_compile_macros(module, is_active)
+    reuse_macros = _get_compile_macros(reuse_module, is_active)
+    if macros != reuse_macros:
+        return (f"their compile definitions differ (only {module.get_name()}: {','.join(sorted(macros - reuse_macros)) or '-'}; "
+                f"only {reuse_module.get_name()}: {','.join(sorted(reuse_macros - macros)) or '-'})")
+    return None
+
 class CmakeListsGenerator:
     """Generates a CMakeLists.txt file for a given project."""
     def __init__(self, project: 'ProjectDefinitionBase'):
         self.project = project
         self.output_path = project.get_path()
         self.content = []
+        self.public_reach = {}
+        self.dropped_link_edges = []
+        self.link_depends:dict[int,tuple] = {}
+        self.fragment_cache:dict[str,dict] = None
+        self.build_modes:list[dict] = None
+        self.mode_masks:list[int] = []
+        self.activations:dict[str,int] = {}
+        self.superbuild = False
+        self.compiler_launcher = False
+        self.ipo = False
+        self.pgo = False
+        self.link_tuning = False
 
     def _get_relative_path(self, path: Path) -> Path:
         """Converts an absolute path to a relative path from the current project's root directory."""
@@ -469,6 +1183,16 @@ class CmakeListsGenerator:
 
         self.content.append("")
         
+        if self.compiler_launcher:
+            self._generate_compiler_launcher()
+        if self.ipo:
+            self._generate_ipo()
+        if self.pgo:
+            self._generate_pgo()
+        if self.link_tuning:
+            self._generate_link_tuning()
+        if self.build_modes is not None:
+            return # the per mode activation lists are inserted here once every check is known
         self.content.extend([
             'string(REPLACE ";" " " ACTIVATED_KEYS_LIST "${ACTIVATED_KEYS}")',
             "function(check_keys_intersection required_keys result_var)",
@@ -489,15 +1213,179 @@ class CmakeListsGenerator:
             ""
         ])
 
+    def _generate_compiler_launcher(self):
+        """Wraps the compiler in the launcher a build mode names (NBSGP_COMPILER_LAUNCHER),with its cache in
+        NBSGP_COMPILER_CACHE_DIR and paths made relative to NBSGP_COMPILER_BASE_DIR so other checkouts hit the cache."""
+        cache_dir = self._get_relative_path(_get_compiler_cache_dir(self.project))
+        base_dir = self._get_relative_path(_get_compiler_base_dir(self.project) or self.output_path)
+        self.content.extend([
+            "if(NBSGP_COMPILER_LAUNCHER AND NOT CMAKE_CXX_COMPILER_LAUNCHER)",
+            "    find_program(NBSGP_COMPILER_LAUNCHER_PATH NAMES ${NBSGP_COMPILER_LAUNCHER})",
+            "    if(NBSGP_COMPILER_LAUNCHER_PATH)",
+            "        if(NOT NBSGP_COMPILER_CACHE_DIR)",
+            f'            set(NBSGP_COMPILER_CACHE_DIR "${{PROJECT_SOURCE_DIR}}/{cache_dir}")',
+            "        endif()",
+            "        if(NOT NBSGP_COMPILER_BASE_DIR)",
+            f'            get_filename_component(NBSGP_COMPILER_BASE_DIR "${{PROJECT_SOURCE_DIR}}/{base_dir}" ABSOLUTE)',
+            "        endif()",
+            '        get_filename_component(NBSGP_COMPILER_LAUNCHER_NAME "${NBSGP_COMPILER_LAUNCHER_PATH}" NAME_WE)',
+            '        if(NBSGP_COMPILER_LAUNCHER_NAME STREQUAL "sccache")',
+            '            set(CMAKE_CXX_COMPILER_LAUNCHER "${CMAKE_COMMAND}" -E env "SCCACHE_DIR=${NBSGP_COMPILER_CACHE_DIR}" "SCCACHE_BASEDIRS=${NBSGP_COMPILER_BASE_DIR}" "${NBSGP_COMPILER_LAUNCHER_PATH}")',
+            "        else()",
+            '            set(CMAKE_CXX_COMPILER_LAUNCHER "${CMAKE_COMMAND}" -E env "CCACHE_DIR=${NBSGP_COMPILER_CACHE_DIR}" "CCACHE_BASEDIR=${NBSGP_COMPILER_BASE_DIR}" CCACHE_NOHASHDIR=1 "${NBSGP_COMPILER_LAUNCHER_PATH}")',
+            "        endif()",
+            '        if(CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")',
+            "            # Debug info keeps paths relative to the base dir too,or every checkout would miss",
+            '            add_compile_options("-fdebug-prefix-map=${NBSGP_COMPILER_BASE_DIR}=.")',
+            "        endif()",
+            "    else()",
+            '        message(WARNING "Compiler launcher ${NBSGP_COMPILER_LAUNCHER} not found,building without it")',
+            "    endif()",
+            "endif()",
+            ""])
+
+    def _generate_ipo(self):
+        """Turns on interprocedural optimization for the targets of the project when a build mode sets NBSGP_IPO
+        and the toolchain supports it."""
+        self.content.extend([
+            "if(NBSGP_IPO)",
+            "    include(CheckIPOSupported)",
+            "    check_ipo_supported(RESULT NBSGP_IPO_SUPPORTED OUTPUT NBSGP_IPO_OUTPUT LANGUAGES CXX)",
+            "    if(NBSGP_IPO_SUPPORTED)",
+            "        set(CMAKE_INTERPROCEDURAL_OPTIMIZATION ON)",
+            "    else()",
+            '        message(WARNING "Interprocedural optimization is not supported,building without it: ${NBSGP_IPO_OUTPUT}")',
+            "    endif()",
+            "endif()",
+            ""])
+
+    def _generate_pgo(self):
+        """Instruments the build (NBSGP_PGO GENERATE) or optimizes it with the trained profile (NBSGP_PGO USE) in NBSGP_PGO_DIR,
+        gcc names its profiles after the objects relative to the build dir so the use build finds them."""
+        pgo_dir = self._get_relative_path(_get_pgo_dir(self.project, {}))
+        self.content.extend([
+            "if(NBSGP_PGO)",
+            "    if(NOT NBSGP_PGO_DIR)",
+            f'        set(NBSGP_PGO_DIR "${{PROJECT_SOURCE_DIR}}/{pgo_dir}")',
+            "    endif()",
+            '    string(TOUPPER "${NBSGP_PGO}" NBSGP_PGO_PHASE)',
+            '    if(NBSGP_PGO_PHASE STREQUAL "USE" AND NOT EXISTS "${NBSGP_PGO_DIR}")',
+            '        message(WARNING "No profile data in ${NBSGP_PGO_DIR},build the instrumented mode and run the train command first")',
+            "    endif()",
+            '    if(CMAKE_CXX_COMPILER_ID STREQUAL "GNU")',
+            '        if(NBSGP_PGO_PHASE STREQUAL "GENERATE")',
+            '            add_compile_options("-fprofile-generate=${NBSGP_PGO_DIR}" "-fprofile-prefix-path=${CMAKE_BINARY_DIR}")',
+            '            add_link_options("-fprofile-generate=${NBSGP_PGO_DIR}")',
+            "        else()",
+            '            add_compile_options("-fprofile-use=${NBSGP_PGO_DIR}" "-fprofile-prefix-path=${CMAKE_BINARY_DIR}" -fprofile-partial-training -Wno-missing-profile)',
+            "        endif()",
+            '    elseif(CMAKE_CXX_COMPILER_ID MATCHES "Clang")',
+            '        if(NBSGP_PGO_PHASE STREQUAL "GENERATE")',
+            '            add_compile_options("-fprofile-generate=${NBSGP_PGO_DIR}")',
+            '            add_link_options("-fprofile-generate=${NBSGP_PGO_DIR}")',
+            '        elseif(EXISTS "${NBSGP_PGO_DIR}/default.profdata")',
+            '            add_compile_options("-fprofile-use=${NBSGP_PGO_DIR}/default.profdata")',
+            "        endif()",
+            "    else()",
+            '        message(WARNING "Profile guided optimization is not supported with ${CMAKE_CXX_COMPILER_ID},building without it")',
+            "    endif()",
+            "endif()",
+            ""])
+
+    def _generate_link_tuning(self):
+        """Links with the linker a build mode names (NBSGP_LINKER,lld/mold/gold),splits the debug info out of the objects
+        (NBSGP_SPLIT_DEBUG_INFO) and compresses the debug sections (NBSGP_COMPRESS_DEBUG_SECTIONS),each only when the toolchain takes it."""
+        self.content.extend([
+            "if(NBSGP_LINKER)",
+            "    include(CheckLinkerFlag)",
+            '    string(MAKE_C_IDENTIFIER "NBSGP_LINKER_${NBSGP_LINKER}_SUPPORTED" NBSGP_LINKER_CHECK)',
+            '    check_linker_flag(CXX "-fuse-ld=${NBSGP_LINKER}" ${NBSGP_LINKER_CHECK})',
+            "    if(${NBSGP_LINKER_CHECK})",
+            '        add_link_options("-fuse-ld=${NBSGP_LINKER}")',
+            "    else()",
+            '        message(WARNING "Linker ${NBSGP_LINKER} is not usable,linking with the default one")',
+            "    endif()",
+            "endif()",
+            'if(NBSGP_SPLIT_DEBUG_INFO AND CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")',
+            "    include(CheckCXXCompilerFlag)",
+            "    check_cxx_compiler_flag(-gsplit-dwarf NBSGP_SPLIT_DWARF_SUPPORTED)",
+            "    if(NBSGP_SPLIT_DWARF_SUPPORTED)",
+            "        add_compile_options(-gsplit-dwarf)",
+            "    else()",
+            '        message(WARNING "Split debug info is not supported,keeping it in the objects")',
+            "    endif()",
+            "endif()",
+            'if(NBSGP_COMPRESS_DEBUG_SECTIONS AND CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")',
+            "    include(CheckLinkerFlag)",
+            '    string(TOLOWER "${NBSGP_COMPRESS_DEBUG_SECTIONS}" NBSGP_COMPRESS_TYPE)',
+            '    if(NBSGP_COMPRESS_TYPE MATCHES "^(on|true|yes|1)$")',
+            "        set(NBSGP_COMPRESS_TYPE zlib)",
+            "    endif()",
+            '    string(MAKE_C_IDENTIFIER "NBSGP_COMPRESS_${NBSGP_COMPRESS_TYPE}_SUPPORTED" NBSGP_COMPRESS_CHECK)',
+            '    check_linker_flag(CXX "-gz=${NBSGP_COMPRESS_TYPE}" ${NBSGP_COMPRESS_CHECK})',
+            "    if(${NBSGP_COMPRESS_CHECK})",
+            '        add_compile_options("-gz=${NBSGP_COMPRESS_TYPE}")',
+            '        add_link_options("-gz=${NBSGP_COMPRESS_TYPE}")',
+            "    else()",
+            '        message(WARNING "Compressed debug sections (${NBSGP_COMPRESS_TYPE}) are not supported,keeping them uncompressed")',
+            "    endif()",
+            "endif()",
+            ""])
+
+    def _get_mode_mask(self, mode:dict) -> int:
+        return key_table.get_mask(mode.get('keys') if mode.get('keys') is not None else ['InstallAlways'])
+
+    def _is_active(self, required_mask:int) -> bool:
+        """Generation filter,when keys are resolved per build mode items active in no mode are not emitted at all."""
+        if not _is_generation_active(required_mask):
+            return False
+        if self.build_modes is None:
+            return True
+        return any(_keys_intersection(required_mask, mode_mask) for mode_mask in self.mode_masks)
+
+    def _append_keys_check(self, required_keys:list[str], required_mask:int, result_var:str, indent:str = "") -> str:
+        """Emits the configure time check of required_keys into result_var,
+        or only records it when keys are resolved per build mode. Returns the variable to test in if()."""
+        if self.build_modes is None:
+            self.content.append(f'{indent}check_keys_intersection("{" ".join(required_keys)}" {result_var})')
+            return result_var
+        # configure time checks run in order and may reuse a name,recorded ones must be unique
+        unique_var = result_var
+        suffix = 1
+        while unique_var in self.activations:
+            suffix += 1
+            unique_var = f"{result_var}_{suffix}"
+        self.activations[unique_var] = required_mask
+        return unique_var
+
+    def _generate_mode_activations(self) -> list[str]:
+        """The activation checks resolved for every build mode,CMake only selects the list of NBSGP_MODE."""
+        mode_names = [mode.get('name') for mode in self.build_modes]
+        lines = ["# --- Condition keys resolved per build mode ---",
+                 f'set(NBSGP_MODES "{";".join(mode_names)}")',
+                 "if(NOT NBSGP_MODE IN_LIST NBSGP_MODES)",
+                 '    message(FATAL_ERROR "NBSGP_MODE \'${NBSGP_MODE}\' is not one of \'${NBSGP_MODES}\',configure with a preset from CMakePresets.json")',
+                 "endif()"]
+        for mode, mode_mask in zip(self.build_modes, self.mode_masks):
+            lines.append(f"set(NBSGP_ACTIVE_{mode.get('name')}")
+            lines.extend(f"    {var}" for var, required_mask in self.activations.items() if _keys_intersection(required_mask, mode_mask))
+            lines.append(")")
+        lines.extend(["foreach(active_var IN LISTS NBSGP_ACTIVE_${NBSGP_MODE})",
+                      "    set(${active_var} TRUE)",
+                      "endforeach()",
+                      ""])
+        return lines
+
     def _generate_sub_projects(self):
         """Generates add_subdirectory calls for sub-projects (in-source builds)."""
         self.content.append("# --- Sub-projects (in-source builds) ---")
         sub_projects = self.project.get_sub_project() or []
         for sub in sub_projects:
-            required_keys = " ".join(sub.get_condition_keys())
+            if not self._is_active(sub.get_condition_mask()):
+                continue
             relative_path = self._get_relative_path(sub.get_path())
-            self.content.append(f'check_keys_intersection("{required_keys}" ACTIVATE_SUB_{sub.get_name()})')
-            self.content.append(f'if(ACTIVATE_SUB_{sub.get_name()})')
+            active_key = self._append_keys_check(sub.get_condition_keys(), sub.get_condition_mask(), f"ACTIVATE_SUB_{sub.get_name()}")
+            self.content.append(f'if({active_key})')
             self.content.append(f'    add_subdirectory({relative_path})')
             self.content.append('endif()')
             self.content.append("")
@@ -515,41 +1403,52 @@ class CmakeListsGenerator:
         
         # Process regular dependencies
         for dep in all_deps:
+            if not self._is_active(dep.required_mask):
+                continue
             dep_project:ProjectDefinitionBase = dep.project
             if not dep_project.get_should_install():
                 raise ValueError(f"Error: The dependency project '{dep_project.get_name()}' must be installable (should_install=True) to be found by find_package.")
 
-            required_keys = " ".join(dep.required_keys)
-            self.content.append(f'check_keys_intersection("{required_keys}" ACTIVATE_DEP_{dep_project.get_name()})')
-            self.content.append(f'if(ACTIVATE_DEP_{dep_project.get_name()})')
+            active_key = self._append_keys_check(dep.required_keys, dep.required_mask, f"ACTIVATE_DEP_{dep_project.get_name()}")
+            self.content.append(f'if({active_key})')
+            # In a superbuild the dependency targets come from its add_subdirectory,not from its install tree
+            indent = "    "
+            if self.superbuild:
+                self.content.append('    if(NOT NBSGP_SUPERBUILD)')
+                indent = "        "
             
             # Decide path mode based on use_relative_path
             if dep.use_relative_path:
                 # Path is relative to the main project's root
                 local_install_path = dep_project._get_relative_path(dep_project.get_install_dir())
                 relative_project_path = self._get_relative_path(dep_project.get_path())
-                self.content.append(f'    find_package({dep_project.get_name()} REQUIRED PATHS "${{CMAKE_SOURCE_DIR}}/{relative_project_path}/${{MODE_PATH}}/{local_install_path}")')
+                self.content.append(f'{indent}find_package({dep_project.get_name()} REQUIRED PATHS "${{CMAKE_SOURCE_DIR}}/{relative_project_path}/${{MODE_PATH}}/{local_install_path}")')
             else:
                 # Use absolute path
                 local_install_path = dep_project._get_relative_path(dep_project.get_install_dir())
                 absolute_project_path = str(dep_project.get_path()).replace("\\", "/")
-                self.content.append(f'    find_package({dep_project.get_name()} REQUIRED PATHS "{absolute_project_path}/${{MODE_PATH}}/{local_install_path}")')
+                self.content.append(f'{indent}find_package({dep_project.get_name()} REQUIRED PATHS "{absolute_project_path}/${{MODE_PATH}}/{local_install_path}")')
             
+            if self.superbuild:
+                self.content.append('    endif()')
             self.content.append('endif()')
             self.content.append("")
 
         # Process external dependencies
         for dep in all_external_deps:
+            if not self._is_active(dep.required_mask):
+                continue
             dep_project:ExternalProjectDefinitionBase = dep.project
-            required_keys = " ".join(dep.required_keys)
-            self.content.append(f'check_keys_intersection("{required_keys}" ACTIVATE_EXT_{dep_project.get_name()})')
-            self.content.append(f'if(ACTIVATE_EXT_{dep_project.get_name()})')
+            active_key = self._append_keys_check(dep.required_keys, dep.required_mask, f"ACTIVATE_EXT_{dep_project.get_name()}")
+            self.content.append(f'if({active_key})')
             if dep.use_relative_path:
                 relative_install_path = self._get_relative_path(dep_project.get_install_dir())
+                # CMAKE_SOURCE_DIR is the superbuild root there,not this project
+                source_dir = "PROJECT_SOURCE_DIR" if self.superbuild else "CMAKE_SOURCE_DIR"
                 if dep_project.get_project_type().upper() == "Package".upper():
-                    self.content.append(f'    find_package({dep_project.get_package_name()} REQUIRED PATHS "${{CMAKE_SOURCE_DIR}}/{relative_install_path}")')
+                    self.content.append(f'    find_package({dep_project.get_package_name()} REQUIRED PATHS "${{{source_dir}}}/{relative_install_path}")')
                 elif dep_project.get_project_type().upper() == "subdirectory".upper():
-                    self.content.append(f'    add_subdirectory(${{CMAKE_SOURCE_DIR}}/{relative_install_path})')                    
+                    self._append_external_subdirectory(dep_project, f'${{{source_dir}}}/{relative_install_path}')
                 else:
                     raise ValueError(f"Error: The dependency external project '{dep_project.get_name()}' has unknow project type '{dep_project.get_project_type()}'")
             else:
@@ -557,23 +1456,117 @@ class CmakeListsGenerator:
                 if dep_project.get_project_type().upper() == "Package".upper():
                     self.content.append(f'    find_package({dep_project.get_package_name()} REQUIRED PATHS "{absolute_install_path}")')
                 elif dep_project.get_project_type().upper() == "subdirectory".upper():
-                    self.content.append(f'    add_subdirectory({absolute_install_path})')    
+                    self._append_external_subdirectory(dep_project, absolute_install_path)
                 else:
                     raise ValueError(f"Error: The dependency external project '{dep_project.get_name()}' has unknow project type '{dep_project.get_project_type()}'")
             self.content.append('endif()')
             self.content.append("")
         self.content.append("")
 
+    def _generate_unity_build(self, module:ModuleDefinitionBase):
+        """Unity build properties of a module,a build mode turns them off with NBSGP_UNITY_BUILD=OFF."""
+        target_name = module.get_name()
+        unity_properties = "UNITY_BUILD ON"
+        if module.get_unity_batch_size() is not None:
+            unity_properties += f" UNITY_BUILD_BATCH_SIZE {module.get_unity_batch_size()}"
+        self.content.append("    if(NOT DEFINED NBSGP_UNITY_BUILD OR NBSGP_UNITY_BUILD)")
+        self.content.append(f"        set_target_properties({target_name} PROPERTIES {unity_properties})")
+        self.content.append("    endif()")
+        excluded = _get_unity_excluded_files(module)
+        if excluded:
+            self.content.append("    set_source_files_properties(")
+            self.content.extend([f"        ${{PROJECT_SOURCE_DIR}}/{self._get_relative_path(path)}" for path in excluded])
+            self.content.append("        PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON)")
+
+    def _process_pch_list(self, entries:list[Path|str], build_interface:bool) -> list[str]:
+        processed = []
+        for entry in entries:
+            if str(entry).startswith("<"):
+                processed.append(str(entry))
+            elif build_interface:
+                processed.append(f"$<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{self._get_relative_path(entry)}>")
+            else:
+                processed.append(f"${{PROJECT_SOURCE_DIR}}/{self._get_relative_path(entry)}")
+        return list(dict.fromkeys(processed))
+
+    def _generate_precompile_headers(self, module:ModuleDefinitionBase, lib_type:str):
+        """The module's own precompiled headers,pch_reuse_from is emitted after every module exists."""
+        public_pch = self._process_pch_list(module.get_public_pch() or [], True)
+        private_pch = self._process_pch_list(module.get_private_pch() or [], False) if lib_type != "INTERFACE" else []
+        if not public_pch and not private_pch:
+            return
+        self.content.append(f"    target_precompile_headers({module.get_name()}")
+        if public_pch:
+            self.content.append("        INTERFACE" if lib_type == "INTERFACE" else "        PUBLIC")
+            self.content.extend([f"            {entry}" for entry in public_pch])
+        if private_pch:
+            self.content.append("        PRIVATE")
+            self.content.extend([f"            {entry}" for entry in private_pch])
+        self.content.append("    )")
+
+    def _generate_pch_reuse(self, modules:list[ModuleDefinitionBase]):
+        """REUSE_FROM for modules sharing another module's precompiled header. When the flags do not match
+        the module precompiles the same headers itself,as it does when the other module is not configured."""
+        lines = []
+        for module in modules:
+            reuse_dep = module.get_pch_reuse_from()
+            if reuse_dep is None or not self._is_active(module.get_condition_mask()) or not self._is_active(reuse_dep.required_mask):
+                continue
+            if module.get_library_type().upper() == "INTERFACE":
+                continue
+            reuse_module = reuse_dep.module
+            reuse_pch = self._process_pch_list((reuse_module.get_public_pch() or []) + (reuse_module.get_private_pch() or []), False)
+            problem = _get_pch_reuse_problem(module, reuse_module, self._is_active)
+            lines.append(f"if(TARGET {module.get_name()})")
+            if problem is None:
+                lines.append(f"    if(TARGET {reuse_module.get_name()})")
+                lines.append(f"        target_precompile_headers({module.get_name()} REUSE_FROM {reuse_module.get_name()})")
+                lines.append("    else()")
+                lines.append(f"        target_precompile_headers({module.get_name()} PRIVATE {' '.join(reuse_pch)})")
+                lines.append("    endif()")
+            else:
+                print(f"Warning: Module '{self.project.get_name()}::{module.get_name()}' can not reuse the precompiled header of "
+                      f"'{reuse_module.get_owner_project().get_name()}::{reuse_module.get_name()}',{problem}. It precompiles the same headers itself.")
+                lines.append(f"    target_precompile_headers({module.get_name()} PRIVATE {' '.join(reuse_pch)})")
+            lines.append("endif()")
+        if lines:
+            self.content.append("# --- Precompiled header reuse ---")
+            self.content.extend(lines)
+
+    def _append_external_subdirectory(self, dep_project:'ExternalProjectDefinitionBase', source_path:str):
+        """Adds a subdirectory external project,in a superbuild only the first project using it adds it."""
+        if not self.superbuild:
+            self.content.append(f'    add_subdirectory({source_path})')
+            return
+        property_name = f"NBSGP_EXT_{dep_project.get_name()}"
+        self.content.extend([f'    get_property(NBSGP_EXT_ADDED GLOBAL PROPERTY {property_name})',
+                             '    if(NOT NBSGP_EXT_ADDED)',
+                             f'        set_property(GLOBAL PROPERTY {property_name} TRUE)',
+                             f'        add_subdirectory({source_path} "${{CMAKE_BINARY_DIR}}/external/{dep_project.get_name()}")',
+                             '    endif()'])
+
     def _generate_modules(self):
         """Generates targets for the project's own modules."""
         self.content.append("# --- Project module definitions ---")
         all_modules = (self.project.get_public_modules() or []) + (self.project.get_private_modules() or [])
+        fragment_cache = None
+        if self.project.get_module_fragments() and self.project.get_cache_dir() is not None:
+            fragment_cache = self._load_fragment_cache()
+        used_fragments:dict[str,dict] = {}
         for module in all_modules:
+            if not self._is_active(module.get_condition_mask()):
+                continue
+            if fragment_cache is not None:
+                fingerprint = self._module_fingerprint(module)
+                if self._reuse_module_fragment(module, fragment_cache.get(module.get_name()), fingerprint):
+                    used_fragments[module.get_name()] = fragment_cache[module.get_name()]
+                    continue
+                module_start = len(self.content)
+                activations_start = len(self.activations)
             self.content.append(f"# Module: {module.get_name()}")
             
-            required_keys = " ".join(module.get_condition_keys())
-            self.content.append(f'check_keys_intersection("{required_keys}" ACTIVATE_MOD_{module.get_name()})')
-            self.content.append(f'if(ACTIVATE_MOD_{module.get_name()})')
+            active_key = self._append_keys_check(module.get_condition_keys(), module.get_condition_mask(), f"ACTIVATE_MOD_{module.get_name()}")
+            self.content.append(f'if({active_key})')
 
 
             target_name = module.get_name()
@@ -591,12 +1584,34 @@ class CmakeListsGenerator:
                 raise ValueError(f"Error: The module '{module.get_owner_project().get_name()}::{module.get_name()}' has unknow module type '{row_lib_type}'")
             if lib_type != "EXECUTABLE":
                 self.content.append(f"    add_library({target_name} {lib_type})")
+                if self.superbuild:
+                    self.content.append("    if(NBSGP_SUPERBUILD)")
+                    self.content.append(f"        add_library({self.project.get_name()}::{target_name} ALIAS {target_name})")
+                    self.content.append("    endif()")
             else:
                 self.content.append(f"    add_executable({target_name})")               
             
             # Source file processing
-            public_sources = self._process_source_list(module.get_public_source_files() or [])
-            private_sources = self._process_source_list(module.get_private_source_files() or [])
+            public_source_var = f"PUBLIC_SRC_{target_name.upper()}"
+            private_source_var = f"PRIVATE_SRC_{target_name.upper()}"
+            glob_sources = module.get_glob_sources()
+            if glob_sources:
+                public_sources = module.get_public_source_entries() or []
+                private_sources = (module.get_private_source_entries() or []) if lib_type != "INTERFACE" else []
+                if public_sources:
+                    self._generate_source_globs(module, public_source_var, public_sources)
+                    self.content.append(f'    list(TRANSFORM {public_source_var} REPLACE "^(.*/)?([^/]+)$" "$<INSTALL_INTERFACE:src/{target_name}/\\\\2>" OUTPUT_VARIABLE {public_source_var}_INSTALL)')
+                if private_sources:
+                    self._generate_source_globs(module, private_source_var, private_sources)
+                public_install_items = [f"${{{public_source_var}_INSTALL}}"]
+                public_build_items = [f"${{{public_source_var}_BUILD}}"]
+                private_build_items = [f"${{{private_source_var}_BUILD}}"]
+            else:
+                public_sources = self._process_source_list(module.get_public_source_files() or [])
+                private_sources = self._process_source_list(module.get_private_source_files() or [])
+                public_install_items = list(dict.fromkeys(f"$<INSTALL_INTERFACE:src/{target_name}/{os.path.basename(s)}>" for s in public_sources))
+                public_build_items = [f"$<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{s}>" for s in public_sources]
+                private_build_items = [f"$<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{s}>" for s in private_sources]
             
             public_include = self._process_include_list(module.get_public_include_files() or [])
             private_include = self._process_include_list(module.get_private_include_files() or [])
@@ -607,15 +1622,13 @@ class CmakeListsGenerator:
                 if public_sources:
                     if lib_type != "INTERFACE":
                         self.content.append(f"        PUBLIC")
-                        self.content.extend([f"            $<INSTALL_INTERFACE:src/{target_name}/{os.path.basename(s)}>" for s in public_sources])
-                        self.content.extend([f"            $<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{s}>" for s in public_sources])
                     else:
                         self.content.append(f"        INTERFACE")
-                        self.content.extend([f"            $<INSTALL_INTERFACE:src/{target_name}/{os.path.basename(s)}>" for s in public_sources])
-                        self.content.extend([f"            $<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{s}>" for s in public_sources])                        
+                    self.content.extend([f"            {s}" for s in public_install_items])
+                    self.content.extend([f"            {s}" for s in public_build_items])
                 if private_sources and lib_type != "INTERFACE":
                     self.content.append(f"        PRIVATE")
-                    self.content.extend([f"            $<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/{s}>" for s in private_sources])
+                    self.content.extend([f"            {s}" for s in private_build_items])
                 self.content.append("    )")
                 
             if public_include or private_include:
@@ -635,23 +1648,27 @@ class CmakeListsGenerator:
                 self.content.append("    )")
 
             # Macro definitions
-            public_macros = module.get_public_macros() + module.get_owner_project().get_public_macros()
-            private_macros = module.get_private_macros() + module.get_owner_project().get_private_macros()
+            public_macros = list(dict.fromkeys(module.get_public_macros() + module.get_owner_project().get_public_macros()))
+            private_macros = list(dict.fromkeys(module.get_private_macros() + module.get_owner_project().get_private_macros()))
             if lib_type != "INTERFACE":
                 if module.get_public_macros(): self.content.append(f"    target_compile_definitions({target_name} PUBLIC {' '.join(public_macros)})")
                 if module.get_private_macros(): self.content.append(f"    target_compile_definitions({target_name} PRIVATE {' '.join(private_macros)})")
             else:
                 if module.get_public_macros(): self.content.append(f"    target_compile_definitions({target_name} INTERFACE {' '.join(public_macros)})")
+            if module.get_unity_build() and lib_type != "INTERFACE":
+                self._generate_unity_build(module)
+            self._generate_precompile_headers(module, lib_type)
             # Link dependencies
 
             # Public link dependencies     
             self.content.append("")
-            public_deps:list[ModuleDependencyBase] = module.get_public_depends_modules() or []
+            public_deps, private_deps, public_ext_deps, private_ext_deps = self._get_link_depends(module)
             for dep in public_deps:
+                if not self._is_active(dep.required_mask):
+                    continue
                 dep_module_name = f"{dep.module.get_owner_project().get_name()}::{dep.module.get_name()}" if dep.module.get_owner_project().get_name() != self.project.get_name() else f"{dep.module.get_name()}" 
                 active_key = f"{module.get_name().upper()}_ACTIVATE_DEP_{dep.module.get_name().upper()}"
-                dep_required_keys = " ".join(dep.required_keys)
-                self.content.append(f'    check_keys_intersection("{dep_required_keys}" {active_key})')
+                active_key = self._append_keys_check(dep.required_keys, dep.required_mask, active_key, '    ')
                 self.content.append(f'    if({active_key})')
                 if lib_type != "INTERFACE":
                     self.content.append(f"        target_link_libraries({target_name} PUBLIC {dep_module_name})")
@@ -660,12 +1677,12 @@ class CmakeListsGenerator:
                 self.content.append(f'    endif()')
                 
             # Private link dependencies
-            private_deps:list[ModuleDependencyBase] = module.get_private_depends_modules() or []
             for dep in private_deps:
+                if not self._is_active(dep.required_mask):
+                    continue
                 dep_module_name = f"{dep.module.get_owner_project().get_name()}::{dep.module.get_name()}" if dep.module.get_owner_project().get_name() != self.project.get_name() else f"{dep.module.get_name()}" 
                 active_key = f"{module.get_name().upper()}_ACTIVATE_DEP_{dep.module.get_name().upper()}"
-                dep_required_keys = " ".join(dep.required_keys)
-                self.content.append(f'    check_keys_intersection("{dep_required_keys}" {active_key})')
+                active_key = self._append_keys_check(dep.required_keys, dep.required_mask, active_key, '    ')
                 self.content.append(f'    if({active_key})')
                 if lib_type != "INTERFACE":
                     self.content.append(f"        target_link_libraries({target_name} PUBLIC {dep_module_name})")
@@ -674,12 +1691,12 @@ class CmakeListsGenerator:
                 self.content.append(f'    endif()')
                 
             # Public ext link dependencies
-            public_ext_deps:list[ExternalModuleDependencyBase] = module.get_public_external_depends() or []
             for dep in public_ext_deps:
+                if not self._is_active(dep.required_mask):
+                    continue
                 dep_module_name = f"{dep.module.get_owner_project().get_name()}::{dep.module.get_library_name()}" if dep.module.get_owner_project().get_name() != self.project.get_name() and dep.module.get_use_absolute_name() is False else f"{dep.module.get_library_name()}" 
                 active_key = f"{module.get_name().upper()}_ACTIVATE_EXT_DEP_{dep.module.get_name().upper()}"
-                dep_required_keys = " ".join(dep.required_keys)
-                self.content.append(f'    check_keys_intersection("{dep_required_keys}" {active_key})')
+                active_key = self._append_keys_check(dep.required_keys, dep.required_mask, active_key, '    ')
                 self.content.append(f'    if({active_key})')
                 if lib_type != "INTERFACE":
                     self.content.append(f"    target_link_libraries({target_name} PUBLIC {dep_module_name})")
@@ -688,12 +1705,12 @@ class CmakeListsGenerator:
                 self.content.append(f'    endif()')
                 
             # Private ext link dependencies
-            private_ext_deps:list[ExternalModuleDependencyBase] = module.get_private_external_depends() or []
             for dep in private_ext_deps:
+                if not self._is_active(dep.required_mask):
+                    continue
                 dep_module_name = f"{dep.module.get_owner_project().get_name()}::{dep.module.get_library_name()}" if dep.module.get_owner_project().get_name() != self.project.get_name() and dep.module.get_use_absolute_name() is False else f"{dep.module.get_library_name()}" 
                 active_key = f"{module.get_name().upper()}_ACTIVATE_EXT_DEP_{dep.module.get_name().upper()}"
-                dep_required_keys = " ".join(dep.required_keys)
-                self.content.append(f'    check_keys_intersection("{dep_required_keys}" {active_key})')
+                active_key = self._append_keys_check(dep.required_keys, dep.required_mask, active_key, '    ')
                 self.content.append(f'    if({active_key})')
                 if lib_type != "INTERFACE":
                     self.content.append(f"    target_link_libraries({target_name} PUBLIC {dep_module_name})")
@@ -728,10 +1745,11 @@ class CmakeListsGenerator:
                     
                 if public_sources:
                     # Need to do GLOB_RECURSE again for install
-                    public_header_glob_var = f"PUBLIC_SRC_{target_name.upper()}"
-                    self.content.append(f"    set({public_header_glob_var}")
-                    self.content.extend([f"        {s}" for s in public_sources])
-                    self.content.append("    )")
+                    public_header_glob_var = public_source_var
+                    if not glob_sources:
+                        self.content.append(f"    set({public_header_glob_var}")
+                        self.content.extend([f"        {s}" for s in public_sources])
+                        self.content.append("    )")
                     
                     self.content.append(f"""
     install(FILES
@@ -740,14 +1758,228 @@ class CmakeListsGenerator:
     )""")
             self.content.append('endif()')
             self.content.append("")
+            if fragment_cache is not None:
+                used_fragments[module.get_name()] = self._write_module_fragment(module, module_start, activations_start, fingerprint)
+        if fragment_cache is not None:
+            self._save_fragment_cache(fragment_cache, used_fragments)
+        self._generate_pch_reuse(all_modules)
             
         if self.project.get_should_install():
-            self.content.append(f"""
+            install_export = f"""
 install(EXPORT {self.project.get_name()}Targets
     FILE {self.project.get_name()}Config.cmake
     NAMESPACE {self.project.get_name()}::
     DESTINATION lib/cmake/{self.project.get_name()}
-)""")
+)"""
+            if self.superbuild:
+                # The installed package config of a superbuild would name targets of other projects it does not export
+                install_export = f"\nif(NOT NBSGP_SUPERBUILD){install_export}\nendif()"
+            self.content.append(install_export)
+
+    def _get_fragment_path(self, module_name:str) -> Path:
+        return Path(self.project.get_cache_dir()) / module_fragment_dir_name / f"{module_name}.cmake"
+
+    def _load_fragment_cache(self) -> dict[str,dict]:
+        cache_file = Path(self.project.get_cache_dir()) / module_fragment_cache_file_name
+        if not cache_file.is_file():
+            return {}
+        try:
+            with open(cache_file, "r", encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not read module fragment cache {cache_file},emitting every module again: {e}")
+            return {}
+
+    def _save_fragment_cache(self, fragment_cache:dict[str,dict], used_fragments:dict[str,dict]):
+        for module_name in fragment_cache.keys() - used_fragments.keys():
+            try:
+                self._get_fragment_path(module_name).unlink(missing_ok=True)
+            except OSError as e:
+                print(f"Warning: Could not delete stale module fragment of {module_name}: {e}")
+        cache_file = Path(self.project.get_cache_dir()) / module_fragment_cache_file_name
+        get_artifact_store(self.project.get_cache_dir()).write(cache_file, json.dumps(used_fragments, indent=1))
+
+    def _module_fingerprint(self, module:ModuleDefinitionBase) -> str:
+        """Hash of everything the block emitted for a module is built from."""
+        inputs = [module_fragment_format, _stat_stamp(__file__), generation_keys_filter, self.superbuild,
+                  [(mode.get('name'), mode.get('keys')) for mode in self.build_modes or []],
+                  self.project.get_name(), str(self.output_path), str(self.project.get_cache_dir()), self.project.get_should_install(),
+                  self.project.get_public_macros(), self.project.get_private_macros(),
+                  module.get_name(), str(module.get_path()), module.get_library_type(), module.get_condition_keys(),
+                  module.get_public_macros(), module.get_private_macros(),
+                  [str(path) for path in module.get_public_include_files() or []],
+                  [str(path) for path in module.get_private_include_files() or []]]
+        if module.get_unity_build():
+            inputs.append([module.get_unity_batch_size(), [str(path) for path in _get_unity_excluded_files(module)]])
+        inputs.append([[str(entry) for entry in module.get_public_pch() or []], [str(entry) for entry in module.get_private_pch() or []]])
+        if module.get_glob_sources():
+            source_filter = module.get_source_filter()
+            inputs.append([module.get_source_extensions(), module.get_exclude()])
+            for entries in (module.get_public_source_entries() or [], module.get_private_source_entries() or []):
+                for entry in entries:
+                    inputs.append(str(entry))
+                    if _cmake_source_glob(entry) is None: # expanded here rather than by CMake
+                        snapshot = self.project.get_source_snapshot()
+                        found_files = snapshot.find_files(entry, source_filter) if snapshot is not None else _find_files(entry, None, source_filter)
+                        inputs.append(sorted(str(f) for f in found_files))
+        else:
+            # Absolute paths,the relative ones emitted only differ by output_path which is already hashed
+            snapshot = self.project.get_source_snapshot()
+            for sources in (module.get_public_source_files() or [], module.get_private_source_files() or []):
+                files = []
+                for path in sources:
+                    if os.path.splitext(path)[1]:
+                        files.append(str(path))
+                    else:
+                        files.extend(str(f) for f in snapshot.find_files(path))
+                inputs.append(sorted(set(files)))
+        for depends in self._get_link_depends(module):
+            inputs.append([(dep.module.get_owner_project().get_name(), dep.module.get_name(), dep.required_keys, self._is_active(dep.required_mask),
+                            dep.module.get_library_name() if isinstance(dep, ExternalModuleDependencyBase) else None,
+                            dep.module.get_use_absolute_name() if isinstance(dep, ExternalModuleDependencyBase) else None)
+                           for dep in depends])
+        return hashlib.sha256(repr(inputs).encode('utf-8')).hexdigest()
+
+    def _append_fragment_include(self, module:ModuleDefinitionBase, fragment_file:Path):
+        self.content.append(f"# Module: {module.get_name()}")
+        self.content.append(f'include("${{PROJECT_SOURCE_DIR}}/{self._get_relative_path(fragment_file)}")')
+        self.content.append("")
+
+    def _reuse_module_fragment(self, module:ModuleDefinitionBase, entry:dict, fingerprint:str) -> bool:
+        """Includes the fragment written by an earlier generation when the module's inputs did not change."""
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return False
+        fragment_file = self._get_fragment_path(module.get_name())
+        if not fragment_file.is_file():
+            return False
+        # The activation checks of a cached module still have to reach the per mode lists
+        if any(var in self.activations for var, keys in entry["activations"]):
+            return False
+        for var, keys in entry["activations"]:
+            self.activations[var] = key_table.get_mask(keys)
+        self._append_fragment_include(module, fragment_file)
+        return True
+
+    def _write_module_fragment(self, module:ModuleDefinitionBase, module_start:int, activations_start:int, fingerprint:str) -> dict:
+        """Moves the block just emitted for module into its fragment file,leaving an include() in its place."""
+        fragment_file = self._get_fragment_path(module.get_name())
+        fragment_file.parent.mkdir(parents=True, exist_ok=True)
+        get_artifact_store(self.project.get_cache_dir()).write(fragment_file, "\n".join(self.content[module_start:]))
+        del self.content[module_start:]
+        self._append_fragment_include(module, fragment_file)
+        activations = [[var, key_table.get_keys(mask)] for var, mask in list(self.activations.items())[activations_start:]]
+        return {"fingerprint": fingerprint, "activations": activations}
+
+    def _get_link_depends(self, module:ModuleDefinitionBase) -> tuple[list[ModuleDependencyBase],list[ModuleDependencyBase],list[ExternalModuleDependencyBase],list[ExternalModuleDependencyBase]]:
+        """The public,private,public external and private external depends a module links,once per generation."""
+        link_depends = self.link_depends.get(id(module))
+        if link_depends is None:
+            public_deps = self._unique_depends(module.get_public_depends_modules() or [])
+            if self.project.get_reduce_link_edges():
+                public_deps = self._reduce_public_depends(module, public_deps)
+            link_depends = self.link_depends[id(module)] = (public_deps,
+                                                            self._unique_depends(module.get_private_depends_modules() or []),
+                                                            self._unique_depends(module.get_public_external_depends() or []),
+                                                            self._unique_depends(module.get_private_external_depends() or []))
+        return link_depends
+
+    @staticmethod
+    def _unique_depends(depends:list) -> list:
+        """Drops repeated depends on the same module with the same keys,link order matters so the first one stays."""
+        seen = set()
+        unique = []
+        for dep in depends:
+            if (id(dep.module), dep.required_mask) not in seen:
+                seen.add((id(dep.module), dep.required_mask))
+                unique.append(dep)
+        return unique
+
+    def _get_public_reach(self, module:ModuleDefinitionBase, required_mask:int) -> set[int]:
+        """ids of the modules reachable from module through active public depends carrying exactly required_mask."""
+        pending = [module]
+        while pending:
+            current = pending[-1]
+            if (id(current), required_mask) in self.public_reach:
+                pending.pop()
+                continue
+            targets = [dep.module for dep in current.get_public_depends_modules() or []
+                       if dep.required_mask == required_mask and _is_generation_active(dep.required_mask)]
+            missing = [t for t in targets if (id(t), required_mask) not in self.public_reach]
+            if missing:
+                pending.extend(missing)
+                continue
+            reach = set()
+            for target in targets:
+                reach.add(id(target))
+                reach |= self.public_reach[(id(target), required_mask)]
+            self.public_reach[(id(current), required_mask)] = reach
+            pending.pop()
+        return self.public_reach[(id(module), required_mask)]
+
+    def _reduce_public_depends(self, module:ModuleDefinitionBase, public_deps:list[ModuleDependencyBase]) -> list[ModuleDependencyBase]:
+        """Drops public link edges already propagated by another public depend of the module,
+        only when every edge on that path has the same required_keys,so the path is active whenever the edge is.
+        Private depends are never reduced,they do not propagate."""
+        active = [dep for dep in public_deps if _is_generation_active(dep.required_mask)]
+        kept = []
+        for dep in public_deps:
+            if not _is_generation_active(dep.required_mask):
+                kept.append(dep)
+                continue
+            required_mask = dep.required_mask
+            via = next((other for other in active
+                        if other.module is not dep.module and other.required_mask == required_mask
+                        and id(dep.module) in self._get_public_reach(other.module, required_mask)), None)
+            if via is not None:
+                self.dropped_link_edges.append((module, dep, via))
+                print(f"Dropped redundant link edge {module.get_name()} -> {dep.module.get_owner_project().get_name()}::{dep.module.get_name()} (already linked through {via.module.get_owner_project().get_name()}::{via.module.get_name()})")
+                continue
+            kept.append(dep)
+        return kept
+
+    def _generate_source_globs(self, module:ModuleDefinitionBase, var_name:str, entries:list[Path]):
+        """Emits the CMake list var_name (project relative paths) for a module using glob_sources,
+        directory and glob entries become file(GLOB... CONFIGURE_DEPENDS) so new files need no regeneration."""
+        source_filter = module.get_source_filter()
+        globs:dict[str,list[str]] = {}
+        explicit_files:list[str] = []
+        for entry in entries:
+            cmake_glob = _cmake_source_glob(entry)
+            if cmake_glob is not None:
+                command, pattern = cmake_glob
+                globs.setdefault(command, []).append(f'"${{PROJECT_SOURCE_DIR}}/{self._get_relative_path(pattern)}"')
+                continue
+            snapshot = self.project.get_source_snapshot()
+            found_files = snapshot.find_files(entry, source_filter) if snapshot is not None else _find_files(entry, None, source_filter)
+            explicit_files.extend(self._get_relative_path(f) for f in found_files)
+        explicit_files = sorted(set(explicit_files))
+
+        self.content.append(f"    set({var_name})")
+        for command, patterns in globs.items():
+            self.content.append(f'    file({command} NBSGP_GLOBBED CONFIGURE_DEPENDS LIST_DIRECTORIES false RELATIVE "${{PROJECT_SOURCE_DIR}}"')
+            self.content.extend([f"        {pattern}" for pattern in patterns])
+            self.content.append("    )")
+            self.content.append(f"    list(APPEND {var_name} ${{NBSGP_GLOBBED}})")
+        if globs and source_filter is not None:
+            if source_filter.extensions is not None:
+                extensions = "|".join(_fnmatch_to_cmake_regex(ext) for ext in source_filter.extensions)
+                self.content.append(f'    list(FILTER {var_name} INCLUDE REGEX "({extensions})$")')
+            # Excludes only match below the module directory,as SourceFilter does
+            module_dir = self._get_relative_path(module.get_path())
+            module_prefix = "^" if module_dir == "." else f"^{_fnmatch_to_cmake_regex(module_dir)}/"
+            for pattern in source_filter.name_patterns:
+                self.content.append(f'    list(FILTER {var_name} EXCLUDE REGEX "{module_prefix}(.*/)?{_fnmatch_to_cmake_regex(pattern)}(/|$)")')
+            for pattern in source_filter.path_patterns:
+                self.content.append(f'    list(FILTER {var_name} EXCLUDE REGEX "{module_prefix}{_fnmatch_to_cmake_regex(pattern)}(/|$)")')
+        if explicit_files:
+            self.content.append(f"    list(APPEND {var_name}")
+            self.content.extend([f"        {f}" for f in explicit_files])
+            self.content.append("    )")
+        if len(entries) > 1:
+            self.content.append(f"    list(REMOVE_DUPLICATES {var_name})")
+            self.content.append(f"    list(SORT {var_name})")
+        self.content.append(f'    list(TRANSFORM {var_name} PREPEND "$<BUILD_INTERFACE:${{PROJECT_SOURCE_DIR}}/" OUTPUT_VARIABLE {var_name}_BUILD)')
+        self.content.append(f'    list(TRANSFORM {var_name}_BUILD APPEND ">")')
 
     def _process_source_list(self, sources: list[Path]) -> list[str]:
         processed = []
@@ -756,9 +1988,10 @@ install(EXPORT {self.project.get_name()}Targets
                 rel_path = self._get_relative_path(path)
                 processed.append(f'{rel_path}')
             else:
-                all_files = _find_files(path)
+                all_files = self.project.get_source_snapshot().find_files(path)
                 processed.extend([self._get_relative_path(s) for s in all_files])
-        return processed
+        # Directory listings come in file system order,sorting keeps the output identical on every machine
+        return sorted(set(processed))
     
     def _process_include_list(self, sources: list[Path]) -> list[str]:
         processed = []
@@ -768,25 +2001,48 @@ install(EXPORT {self.project.get_name()}Targets
                 raise AttributeError(f"The include path for {self.project.get_name()} must be a directory path, but a file path was provided {path}")
             else:
                 processed.append(f'{rel_path}')
-        return processed
+        return list(dict.fromkeys(processed)) # search order matters,keep the declared one
 
-    def generate(self):
-        """Generates the complete CMakeLists.txt file."""
+    def generate(self, build_modes:list[dict] = None, superbuild:bool = False):
+        """Generates the complete CMakeLists.txt file.
+        With resolve_keys set on the project the condition keys are resolved for each of build_modes here,
+        with superbuild the file also works as an add_subdirectory of a SuperbuildGenerator root."""
+        self.superbuild = superbuild
+        self.compiler_launcher = any(mode.get('compiler_launcher') for mode in build_modes or [])
+        self.ipo = any(mode.get('ipo') for mode in build_modes or [])
+        self.pgo = any(_get_pgo_phase(mode) for mode in build_modes or [])
+        self.link_tuning = any(mode.get(key) for mode in build_modes or [] for key in ('linker', 'split_debug_info', 'compress_debug_sections'))
         self.content = []
+        self.public_reach = {}
+        self.dropped_link_edges = []
+        self.link_depends = {}
+        self.build_modes = None
+        self.activations = {}
+        if self.project.get_resolve_keys():
+            if build_modes:
+                self.build_modes = build_modes
+                self.mode_masks = [self._get_mode_mask(mode) for mode in build_modes]
+            else:
+                print(f"Warning: Project '{self.project.get_name()}' sets resolve_keys but has no build modes,condition keys are checked at configure time.")
         self._generate_header()
+        activations_index = len(self.content)
         self._generate_sub_projects()
         self._generate_dependencies()
         self._generate_modules()
+        if self.build_modes is not None:
+            self.content[activations_index:activations_index] = self._generate_mode_activations()
 
-        with open(self.output_path / "CMakeLists.txt", "w", encoding='utf-8') as f:
-            f.write("\n".join(self.content))
-        print(f"Successfully generated CMakeLists.txt file at: {self.output_path}")
+        if get_artifact_store(self.project.get_cache_dir()).write(self.output_path / "CMakeLists.txt", "\n".join(self.content)):
+            print(f"Successfully generated CMakeLists.txt file at: {self.output_path}")
+        else:
+            print(f"CMakeLists.txt file at: {self.output_path} is up to date")
 
 class CmakePresetGenerator:
-    """Generates a CMakePresets.json file for the project."""
-    def __init__(self, project: 'ProjectDefinitionBase'):
+    """Generates a CMakePresets.json file for the project,or for output_path when given."""
+    def __init__(self, project: 'ProjectDefinitionBase', output_path:Path|str = None, set_mode:bool = False):
         self.project = project
-        self.output_path = project.get_path()
+        self.output_path = Path(output_path) if output_path is not None else project.get_path()
+        self.set_mode = set_mode
 
     def generate(self, build_modes: list[dict]):
         if not build_modes: return
@@ -817,12 +2073,41 @@ class CmakePresetGenerator:
                  "MODE_MACROS": macros
                  }
             }
+            if self.set_mode or self.project.get_resolve_keys():
+                preset["cacheVariables"]["NBSGP_MODE"] = mode_name
+            if mode.get('unity_build') is not None:
+                preset["cacheVariables"]["NBSGP_UNITY_BUILD"] = "ON" if mode.get('unity_build') else "OFF"
+            if mode.get('compiler_launcher'):
+                compiler_cache_dir = os.path.relpath(_get_compiler_cache_dir(self.project), self.output_path).replace("\\", "/")
+                preset["cacheVariables"]["NBSGP_COMPILER_LAUNCHER"] = mode.get('compiler_launcher')
+                preset["cacheVariables"]["NBSGP_COMPILER_CACHE_DIR"] = f"${{sourceDir}}/{compiler_cache_dir}"
+            if mode.get('ipo') is not None:
+                preset["cacheVariables"]["NBSGP_IPO"] = "ON" if mode.get('ipo') else "OFF"
+            if _get_pgo_phase(mode):
+                pgo_dir = os.path.relpath(_get_pgo_dir(self.project, mode), self.output_path).replace("\\", "/")
+                preset["cacheVariables"]["NBSGP_PGO"] = _get_pgo_phase(mode).upper()
+                preset["cacheVariables"]["NBSGP_PGO_DIR"] = f"${{sourceDir}}/{pgo_dir}"
+            if mode.get('linker'):
+                preset["cacheVariables"]["NBSGP_LINKER"] = mode.get('linker')
+            if mode.get('split_debug_info') is not None:
+                preset["cacheVariables"]["NBSGP_SPLIT_DEBUG_INFO"] = "ON" if mode.get('split_debug_info') else "OFF"
+            if mode.get('compress_debug_sections'):
+                compress = mode.get('compress_debug_sections')
+                preset["cacheVariables"]["NBSGP_COMPRESS_DEBUG_SECTIONS"] = "zlib" if compress is True else compress
             configure_presets.append(preset)
 
         presets_data = { "version": 3, "configurePresets": configure_presets }
-        with open(self.output_path / "CMakePresets.json", "w", encoding='utf-8') as f:
-            json.dump(presets_data, f, indent=2)
-        print(f"Successfully generated CMakePresets.json file at: {self.output_path}")
+        if get_artifact_store(self.project.get_cache_dir()).write(self.output_path / "CMakePresets.json", json.dumps(presets_data, indent=2)):
+            print(f"Successfully generated CMakePresets.json file at: {self.output_path}")
+        else:
+            print(f"CMakePresets.json file at: {self.output_path} is up to date")
+
+default_build_modes:list[dict[str,any]] = [
+    {'name': 'Debug','keys': ['InstallAlways', 'Shoping','Release','Debug']},
+    {'name': 'Development','cmake_type':'RelWithDebInfo', 'keys': ['InstallAlways', 'Shoping','Release']},
+    {'name': 'Release','cmake_type':'Release','mode_path':'Release', 'keys': ['InstallAlways', 'Shoping']},
+    {'name': 'Mini','cmake_type':'MinSizeRel','mode_path':'Mini', 'keys': ['InstallAlways', 'Shoping']}
+]
 
 class MakefileGeneratorDefault(MakefileGeneratorBase):
     """Uses CMake's default Makefile generator."""
@@ -831,19 +2116,17 @@ class MakefileGeneratorDefault(MakefileGeneratorBase):
         self.project = project
         self.cmakelists_gen = CmakeListsGenerator(self.project)
         self.cmakepreset_gen = CmakePresetGenerator(self.project)
-        self.build_modes = build_modes if build_modes is not None else[
-            {'name': 'Debug','keys': ['InstallAlways', 'Shoping','Release','Debug']},
-            {'name': 'Development','cmake_type':'RelWithDebInfo', 'keys': ['InstallAlways', 'Shoping','Release']},
-            {'name': 'Release','cmake_type':'Release','mode_path':'Release', 'keys': ['InstallAlways', 'Shoping']},
-            {'name': 'Mini','cmake_type':'MinSizeRel','mode_path':'Mini', 'keys': ['InstallAlways', 'Shoping']}
-        ]
+        self.build_modes = build_modes if build_modes is not None else default_build_modes
 
     def generate_makefile(self):
         """Generates all necessary CMake files without performing a build."""
         print(f"--- Starting generation of build files for project {self.project.get_name()} ---")
-        self.cmakelists_gen.generate()
+        self.cmakelists_gen.generate(self.build_modes)
         self.cmakepreset_gen.generate(self.build_modes)
         print(f"--- Finished generating build files for project {self.project.get_name()} ---")
+
+    def generate_cmakelists(self):
+        self.cmakelists_gen.generate(self.build_modes)
         
     def clean_makefile(self):
         """Recursively cleans all generated CMake files and build directories."""
@@ -858,7 +2141,12 @@ class MakefileGeneratorDefault(MakefileGeneratorBase):
                 cleaned_paths.add(sub_project.get_path())
         
         # 2. Delete generated files and directories for the current project
-        files_to_delete = ["CMakeLists.txt", "CMakePresets.json"]
+        files_to_delete = ["CMakeLists.txt", "CMakePresets.json", graph_cache_pointer_file_name]
+        if self.project.get_cache_dir() is not None:
+            files_to_delete.append(Path(self.project.get_cache_dir()) / graph_cache_file_name)
+            files_to_delete.append(Path(self.project.get_cache_dir()) / source_index_file_name)
+            files_to_delete.append(Path(self.project.get_cache_dir()) / artifact_manifest_file_name)
+            files_to_delete.append(Path(self.project.get_cache_dir()) / module_fragment_cache_file_name)
         for filename in files_to_delete:
             try:
                 file_path = project_path / filename
@@ -867,15 +2155,457 @@ class MakefileGeneratorDefault(MakefileGeneratorBase):
                     print(f"Deleted {file_path}")
             except OSError as e: print(f"Error deleting file {file_path}: {e}")
 
-        build_root = project_path / "build"
-        try:
-            if build_root.exists() and build_root.is_dir():
-                shutil.rmtree(build_root)
-                print(f"Deleted build directory {build_root}")
-        except OSError as e: print(f"Error deleting directory {build_root}: {e}")
+        dirs_to_delete = [project_path / "build"]
+        if self.project.get_cache_dir() is not None:
+            dirs_to_delete.append(Path(self.project.get_cache_dir()) / module_fragment_dir_name)
+            dirs_to_delete.append(Path(self.project.get_cache_dir()) / superbuild_dir_name)
+        for dir_path in dirs_to_delete:
+            try:
+                if dir_path.exists() and dir_path.is_dir():
+                    shutil.rmtree(dir_path)
+                    print(f"Deleted directory {dir_path}")
+            except OSError as e: print(f"Error deleting directory {dir_path}: {e}")
         
         print(f"--- Finished cleaning up {self.project.get_name()} ---")
-        
+
+def _get_build_modes(project:ProjectDefinitionBase) -> list[dict[str,any]]:
+    """The build modes of the project's own generator,the default ones when it has none."""
+    build_modes = getattr(project.get_makefile_generator(), "build_modes", None)
+    return build_modes if build_modes is not None else default_build_modes
+
+superbuild_dir_name = "superbuild"
+
+class SuperbuildGenerator(MakefileGeneratorBase):
+    """Generates one CMake root that add_subdirectory()s every project of the graph,
+    project depends link the Project::Module alias targets directly instead of an installed package."""
+    def __init__(self, project: ProjectDefinitionBase, build_modes:list[dict[str,any]] = None):
+        super().__init__()
+        self.project = project
+        self.build_modes = build_modes if build_modes is not None else _get_build_modes(project)
+        self.output_path = Path(project.get_cache_dir() if project.get_cache_dir() is not None else project.get_path()) / superbuild_dir_name
+        self.cmakepreset_gen = CmakePresetGenerator(project, self.output_path, set_mode = True)
+
+    def _get_projects(self) -> tuple[list[ProjectDefinitionBase],list[ProjectDefinitionBase]]:
+        """Every project of the graph in dependency order,and the ones the root adds (the rest are added as sub-projects)."""
+        project_graph = build_project_dependency_graph(self.project)
+        projects = [project for level in project_graph.get_levels() for project in level]
+        sub_projects = {id(sub) for project in projects for sub in (project.get_sub_project() or [])
+                        if _is_generation_active(sub.get_condition_mask())}
+        return projects, [project for project in projects if id(project) not in sub_projects]
+
+    def _check_target_names(self, projects:list[ProjectDefinitionBase]):
+        """Targets share one namespace in a superbuild,so module names must be unique over the graph."""
+        owners:dict[str,ProjectDefinitionBase] = {}
+        for project in projects:
+            for module in (project.get_public_modules() or []) + (project.get_private_modules() or []):
+                if not _is_generation_active(module.get_condition_mask()):
+                    continue
+                owner = owners.setdefault(module.get_name(), project)
+                if owner is not project:
+                    raise ValueError(f"The module name '{module.get_name()}' is used by both '{owner.get_name()}' and '{project.get_name()}',module names must be unique in a superbuild.")
+
+    def _get_relative_path(self, path:Path) -> str:
+        try:
+            return os.path.relpath(path, self.output_path).replace("\\","/")
+        except ValueError: # another drive
+            return str(path).replace("\\","/")
+
+    def generate_makefile(self):
+        print(f"--- Starting generation of superbuild for project {self.project.get_name()} ---")
+        projects, root_projects = self._get_projects()
+        self._check_target_names(projects)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        for project in projects:
+            CmakeListsGenerator(project).generate(_get_build_modes(project), superbuild = True)
+        content = ["cmake_minimum_required(VERSION 3.20)",
+                   f"project({self.project.get_name()}Superbuild LANGUAGES CXX)",
+                   "",
+                   "# Projects use the targets of each other directly instead of find_package",
+                   "set(NBSGP_SUPERBUILD ON)",
+                   ""]
+        for project in root_projects:
+            content.append(f'add_subdirectory("${{CMAKE_CURRENT_SOURCE_DIR}}/{self._get_relative_path(project.get_path())}" "{project.get_name()}")')
+        content.append("")
+        if get_artifact_store(self.project.get_cache_dir()).write(self.output_path / "CMakeLists.txt", "\n".join(content)):
+            print(f"Successfully generated CMakeLists.txt file at: {self.output_path}")
+        else:
+            print(f"CMakeLists.txt file at: {self.output_path} is up to date")
+        self.cmakepreset_gen.generate(self.build_modes)
+        print(f"--- Finished generating superbuild of {len(projects)} projects at {self.output_path} ---")
+
+    def clean_makefile(self):
+        self.project.get_makefile_generator().clean_makefile()
+
+ninja_dir_prefix = "ninja-"
+ninja_cxx_extensions = (".cpp", ".cc", ".cxx", ".c++", ".C")
+ninja_unity_batch_size = 8 # CMake's UNITY_BUILD_BATCH_SIZE default
+ninja_build_type_flags:dict[str,list[str]] = {
+    "Debug": ["-g"],
+    "RelWithDebInfo": ["-O2", "-g", "-DNDEBUG"],
+    "Release": ["-O3", "-DNDEBUG"],
+    "MinSizeRel": ["-Os", "-DNDEBUG"],
+}
+
+def _ninja_path(path:Path|str) -> str:
+    """Escapes a path for a ninja build line."""
+    return str(path).replace("\\","/").replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+def _ninja_value(value:str) -> str:
+    return value.replace("$", "$$")
+
+def _ninja_args(args:list[str]) -> str:
+    return _ninja_value(" ".join(shlex.quote(str(arg).replace("\\","/")) for arg in args))
+
+class NinjaGenerator(MakefileGeneratorBase):
+    """Writes build/ninja-<mode>/build.ninja of the root project for every build mode straight from the module graph,
+    no CMake configure step runs. Every project of the graph is in the file,project depends link the libraries built next to them.
+    Compiles with gcc/clang style flags,taking the compiler from CXX and the archiver from AR."""
+    def __init__(self, project: ProjectDefinitionBase, build_modes:list[dict[str,any]] = None):
+        super().__init__()
+        self.project = project
+        self.build_modes = build_modes if build_modes is not None else _get_build_modes(project)
+        self.cxx = os.environ.get("CXX", "c++")
+        self.ar = os.environ.get("AR", "ar")
+        self.warned_external:set[int] = set()
+        self.warned_pch:set[int] = set()
+        self.cxx_is_clang:bool = None
+
+    def _get_build_dir(self, mode_name:str) -> Path:
+        return Path(self.project.get_path()) / "build" / f"{ninja_dir_prefix}{mode_name.lower()}"
+
+    @staticmethod
+    def _get_lib_type(module:ModuleDefinitionBase) -> str:
+        row_lib_type = module.get_library_type().upper()
+        if row_lib_type in ("DYNAMICLIBRARY", "DYNAMIC", "DLL", "SHARED"):
+            return "SHARED"
+        if row_lib_type in ("STATIC", "STATICLIBRARY", "LIB"):
+            return "STATIC"
+        if row_lib_type in ("INTERFACE", "EXECUTABLE"):
+            return row_lib_type
+        raise ValueError(f"Error: The module '{module.get_owner_project().get_name()}::{module.get_name()}' has unknow module type '{row_lib_type}'")
+
+    @staticmethod
+    def _get_output_dir(project:ProjectDefinitionBase, directory:Path|str, mode_path:str) -> Path:
+        """Same place the CMakeLists.txt puts it,${PROJECT_SOURCE_DIR}/${MODE_PATH}/<dir>."""
+        return Path(project.get_path()) / mode_path / os.path.relpath(directory, project.get_path())
+
+    def _get_output(self, module:ModuleDefinitionBase, lib_type:str, mode_path:str) -> Path:
+        project = module.get_owner_project()
+        if lib_type == "STATIC":
+            return self._get_output_dir(project, project.get_archive_dir(), mode_path) / f"lib{module.get_name()}.a"
+        binarys_dir = self._get_output_dir(project, project.get_binarys_dir(), mode_path)
+        if lib_type == "SHARED":
+            suffix = ".dll" if sys.platform == "win32" else ".dylib" if sys.platform == "darwin" else ".so"
+            return binarys_dir / f"lib{module.get_name()}{suffix}"
+        return binarys_dir / (f"{module.get_name()}.exe" if sys.platform == "win32" else module.get_name())
+
+    def _get_depends(self, module:ModuleDefinitionBase, mode_mask:int) -> tuple[list[ModuleDefinitionBase],list[ExternalModuleDefinitionBase]]:
+        """Active module and external module depends,public and private alike as the CMakeLists.txt links both PUBLIC."""
+        def active(dep) -> bool:
+            return _is_generation_active(dep.required_mask) and _keys_intersection(dep.required_mask, mode_mask)
+        deps = [dep.module for dep in (module.get_public_depends_modules() or []) + (module.get_private_depends_modules() or [])
+                if active(dep) and _keys_intersection(dep.module.get_condition_mask(), mode_mask)]
+        ext_deps = [dep.module for dep in (module.get_public_external_depends() or []) + (module.get_private_external_depends() or []) if active(dep)]
+        return list({id(dep): dep for dep in deps}.values()), list({id(dep): dep for dep in ext_deps}.values())
+
+    def _get_external_usage(self, ext_module:ExternalModuleDefinitionBase) -> tuple[list[str],list[str]]:
+        """Include and link flags of an external module,guessed from the install layout of its project."""
+        ext_project = ext_module.get_owner_project()
+        install_dir = Path(ext_project.get_install_dir())
+        if id(ext_project) not in self.warned_external:
+            self.warned_external.add(id(ext_project))
+            print(f"Warning: External project '{ext_project.get_name()}' is resolved by CMake,the Ninja generator looks for its headers and libraries in '{install_dir}/include' and '{install_dir}/lib'")
+        include_flags = [f"-I{install_dir / 'include'}"] if (install_dir / "include").is_dir() else []
+        link_flags = [f"-L{install_dir / 'lib'}"] if (install_dir / "lib").is_dir() else []
+        if ext_module.get_library_type().upper() != "INTERFACE":
+            link_flags.append(f"-l{ext_module.get_library_name()}")
+        return include_flags, link_flags
+
+    def _get_usage(self, module:ModuleDefinitionBase, mode_mask:int, usage:dict[int,tuple]) -> tuple[list,list,list,list,list]:
+        """(include dirs,macros,sources,external flags,precompiled headers) a module passes on to the modules linking it."""
+        if id(module) in usage:
+            return usage[id(module)]
+        includes = list(module.get_public_include_files() or [])
+        macros = list(dict.fromkeys(module.get_public_macros() + module.get_owner_project().get_public_macros())) if module.get_public_macros() else []
+        sources = [source for source in module.get_public_source_files() or [] if str(source).endswith(ninja_cxx_extensions)]
+        external_flags = []
+        pch = list(module.get_public_pch() or [])
+        deps, ext_deps = self._get_depends(module, mode_mask)
+        for dep in deps:
+            dep_includes, dep_macros, dep_sources, dep_external_flags, dep_pch = self._get_usage(dep, mode_mask, usage)
+            includes += dep_includes
+            macros += dep_macros
+            sources += dep_sources
+            external_flags += dep_external_flags
+            pch += dep_pch
+        for ext_module in ext_deps:
+            include_flags, link_flags = self._get_external_usage(ext_module)
+            external_flags += include_flags + link_flags
+        usage[id(module)] = result = (list(dict.fromkeys(includes)), list(dict.fromkeys(macros)),
+                                      list(dict.fromkeys(sources)), list(dict.fromkeys(external_flags)), list(dict.fromkeys(pch)))
+        return result
+
+    @staticmethod
+    def _get_pch_header(module:ModuleDefinitionBase, build_dir:Path) -> Path:
+        """The header listing a module's precompiled headers,compiled next to itself as <header>.gch."""
+        return build_dir / "pch" / module.get_owner_project().get_name() / module.get_name() / "nbsgp_pch.hxx"
+
+    def _get_pch(self, module:ModuleDefinitionBase, pch_entries:list[Path|str], mode_mask:int, build_dir:Path, outputs:dict[int,Path]) -> tuple[Path,list]:
+        """(header to -include,entries to precompile for it) of a module,entries are empty when it reuses the header of another module."""
+        reuse_dep = module.get_pch_reuse_from()
+        if reuse_dep is not None and _is_generation_active(reuse_dep.required_mask) and _keys_intersection(reuse_dep.required_mask, mode_mask) \
+                and id(reuse_dep.module) in outputs:
+            reuse_module = reuse_dep.module
+            problem = _get_pch_reuse_problem(module, reuse_module, lambda mask: _is_generation_active(mask) and _keys_intersection(mask, mode_mask))
+            if problem is None:
+                return self._get_pch_header(reuse_module, build_dir), []
+            if id(module) not in self.warned_pch:
+                self.warned_pch.add(id(module))
+                print(f"Warning: Module '{module.get_owner_project().get_name()}::{module.get_name()}' can not reuse the precompiled header of "
+                      f"'{reuse_module.get_owner_project().get_name()}::{reuse_module.get_name()}',{problem}. It precompiles the same headers itself.")
+            pch_entries = (reuse_module.get_public_pch() or []) + (reuse_module.get_private_pch() or [])
+        if not pch_entries:
+            return None, []
+        return self._get_pch_header(module, build_dir), list(dict.fromkeys(pch_entries))
+
+    def _get_link_closure(self, module:ModuleDefinitionBase, mode_mask:int) -> list[ModuleDefinitionBase]:
+        """Every module linked into module,dependents before their depends as static linking needs."""
+        post_order = []
+        visited = {id(module)}
+        pending = [(module, iter(self._get_depends(module, mode_mask)[0]))]
+        while pending:
+            current, deps = pending[-1]
+            dep = next(deps, None)
+            if dep is None:
+                pending.pop()
+                if current is not module:
+                    post_order.append(current)
+                continue
+            if id(dep) not in visited:
+                visited.add(id(dep))
+                pending.append((dep, iter(self._get_depends(dep, mode_mask)[0])))
+        return post_order[::-1]
+
+    def _get_object(self, module:ModuleDefinitionBase, source:Path|str) -> str:
+        relative_source = os.path.relpath(source, module.get_owner_project().get_path()).replace("\\","/").replace("..", "__")
+        return f"obj/{module.get_owner_project().get_name()}/{module.get_name()}/{relative_source}.o"
+
+    def _get_unity_units(self, module:ModuleDefinitionBase, sources:list[str], build_dir:Path) -> list[tuple[str,str]]:
+        """(source, object) pairs of a unity build module,batches of its sources are compiled through generated
+        unity_<n>.cxx files the way CMake's UNITY_BUILD does,sources matched by unity_exclude stay on their own."""
+        excluded = {str(path) for path in _get_unity_excluded_files(module)}
+        batched = [source for source in sources if source not in excluded]
+        units = [(source, self._get_object(module, source)) for source in sources if source in excluded]
+        batch_size = module.get_unity_batch_size() if module.get_unity_batch_size() is not None else ninja_unity_batch_size
+        batch_size = batch_size if batch_size > 0 else max(len(batched), 1) # 0 puts every source in one batch
+        object_dir = f"obj/{module.get_owner_project().get_name()}/{module.get_name()}"
+        unity_dir = build_dir / "unity" / module.get_owner_project().get_name() / module.get_name()
+        store = get_artifact_store(self.project.get_cache_dir())
+        for index in range(0, len(batched), batch_size):
+            unity_file = unity_dir / f"unity_{index // batch_size}.cxx"
+            unity_file.parent.mkdir(parents=True, exist_ok=True)
+            batch = [source.replace("\\", "/") for source in batched[index:index + batch_size]]
+            store.write(unity_file, "".join(f'#include "{source}"\n' for source in batch))
+            units.append((str(unity_file), f"{object_dir}/{unity_file.name}.o"))
+        return units
+
+    def _get_compiler_launcher(self, mode:dict) -> list[str]:
+        """Command prefix running compiles through the mode's compiler_launcher,with the same cache and base dir as the CMake build."""
+        if not mode.get('compiler_launcher'):
+            return []
+        launcher_path = shutil.which(mode.get('compiler_launcher'))
+        if launcher_path is None:
+            print(f"Warning: Compiler launcher '{mode.get('compiler_launcher')}' of mode '{mode.get('name')}' not found,building without it")
+            return []
+        if sys.platform == "win32":
+            return [launcher_path]
+        cache_dir = _get_compiler_cache_dir(self.project)
+        base_dir = _get_compiler_base_dir(self.project) or self.project.get_path()
+        if Path(launcher_path).stem == "sccache":
+            return ["env", f"SCCACHE_DIR={cache_dir}", f"SCCACHE_BASEDIRS={base_dir}", launcher_path]
+        return ["env", f"CCACHE_DIR={cache_dir}", f"CCACHE_BASEDIR={base_dir}", "CCACHE_NOHASHDIR=1", launcher_path]
+
+    def _get_optimization_flags(self, mode:dict, build_dir:Path) -> list[str]:
+        """Compile and link flags of the mode's ipo and pgo settings,the same the CMakeLists.txt uses for gcc and clang."""
+        flags = ["-flto=auto"] if mode.get('ipo') else []
+        phase = _get_pgo_phase(mode)
+        if phase is None:
+            return flags
+        if self.cxx_is_clang is None:
+            try:
+                version = subprocess.run([self.cxx, "--version"], capture_output = True, text = True).stdout
+            except OSError:
+                version = ""
+            self.cxx_is_clang = "clang" in version.lower()
+        pgo_dir = _get_pgo_dir(self.project, mode)
+        if self.cxx_is_clang:
+            if phase == "generate":
+                return flags + [f"-fprofile-generate={pgo_dir}"]
+            return flags + ([f"-fprofile-use={pgo_dir / 'default.profdata'}"] if (pgo_dir / "default.profdata").exists() else [])
+        if phase == "generate":
+            return flags + [f"-fprofile-generate={pgo_dir}", f"-fprofile-prefix-path={build_dir}"]
+        return flags + [f"-fprofile-use={pgo_dir}", f"-fprofile-prefix-path={build_dir}", "-fprofile-partial-training", "-Wno-missing-profile"]
+
+    def _get_link_tuning_flags(self, mode:dict) -> tuple[list[str],list[str]]:
+        """Compile and link flags of the mode's linker,split_debug_info and compress_debug_sections settings,
+        a linker not found is warned about and left out."""
+        compile_flags = ["-gsplit-dwarf"] if mode.get('split_debug_info') else []
+        link_flags = []
+        linker = mode.get('linker')
+        if linker:
+            if shutil.which(f"ld.{linker}") or shutil.which(linker):
+                link_flags.append(f"-fuse-ld={linker}")
+            else:
+                print(f"Warning: Linker '{linker}' of mode '{mode.get('name')}' not found,linking with the default one")
+        if mode.get('compress_debug_sections'):
+            compress = mode.get('compress_debug_sections')
+            compress_flag = f"-gz={'zlib' if compress is True else compress}"
+            compile_flags.append(compress_flag)
+            link_flags.append(compress_flag)
+        return compile_flags, link_flags
+
+    def _generate_mode(self, mode:dict, projects:list[ProjectDefinitionBase], build_dir:Path) -> list[str]:
+        mode_name = mode.get('name')
+        if mode_name is None:
+            raise AttributeError(f"NinjaGenerator get mode failed,no mode name found")
+        mode_mask = key_table.get_mask(mode.get('keys') if mode.get('keys') is not None else ['InstallAlways'])
+        mode_path = mode.get('mode_path') if mode.get('mode_path') is not None else ''
+        cmake_type = mode.get('cmake_type') if mode.get('cmake_type') is not None else mode_name
+        mode_flags = ninja_build_type_flags.get(cmake_type, []) + ["-std=gnu++17"] + \
+                     [f"-D{macro}" for macro in mode.get('macros') or []] + list(mode.get('compile_options') or []) + \
+                     self._get_optimization_flags(mode, build_dir)
+        regenerate = [sys.executable, Path(__file__).resolve(), self.project.get_path(), "build", "--generator=ninja"]
+        if generation_keys_filter is not None:
+            regenerate.append(f"--keys={';'.join(generation_keys_filter)}")
+        regenerate.extend(generation_load_options)
+        definition_files = [Path(__file__).resolve()] + loaded_definition_files
+        link_tuning_compile, link_tuning_link = self._get_link_tuning_flags(mode)
+        mode_flags.extend(link_tuning_compile)
+        launcher = self._get_compiler_launcher(mode)
+        if launcher:
+            mode_flags.append(f"-fdebug-prefix-map={_get_compiler_base_dir(self.project) or self.project.get_path()}=.")
+        content = [f"# build.ninja of {self.project.get_name()} in {mode_name} mode,generated by nbsgp",
+                   "ninja_required_version = 1.3",
+                   f"launcher = {_ninja_args(launcher)}",
+                   f"cxx = {_ninja_args([self.cxx])}",
+                   f"ar = {_ninja_args([self.ar])}",
+                   f"mode_flags = {_ninja_args(mode_flags)}",
+                   f"link_options = {_ninja_args(list(mode.get('link_options') or []) + link_tuning_link)}",
+                   "",
+                   "rule cxx",
+                   "  command = $launcher $cxx $mode_flags $flags -MD -MF $out.d -c $in -o $out",
+                   "  depfile = $out.d",
+                   "  deps = gcc",
+                   "  description = CXX $out",
+                   "rule pch",
+                   "  command = $launcher $cxx $mode_flags $flags -x c++-header -MD -MF $out.d -c $in -o $out",
+                   "  depfile = $out.d",
+                   "  deps = gcc",
+                   "  description = PCH $out",
+                   "rule ar",
+                   "  command = rm -f $out && $ar crs $out $in",
+                   "  description = AR $out",
+                   "rule link",
+                   "  command = $cxx $mode_flags $link_options $in -o $out $libs",
+                   "  description = LINK $out",
+                   "rule link_shared",
+                   "  command = $cxx $mode_flags $link_options -shared $in -o $out $libs",
+                   "  description = LINK $out",
+                   "rule regenerate",
+                   f"  command = {_ninja_args(regenerate)}",
+                   "  description = Regenerating build.ninja",
+                   "  generator = 1",
+                   "  restat = 1", # an unchanged build.ninja is not rewritten
+                   "",
+                   f"build build.ninja: regenerate | {' '.join(_ninja_path(path) for path in definition_files)}",
+                   ""]
+        usage:dict[int,tuple] = {}
+        outputs:dict[int,Path] = {}
+        targets = []
+        for project in projects:
+            for module in (project.get_public_modules() or []) + (project.get_private_modules() or []):
+                if _is_generation_active(module.get_condition_mask()) and _keys_intersection(module.get_condition_mask(), mode_mask):
+                    lib_type = self._get_lib_type(module)
+                    if lib_type != "INTERFACE":
+                        outputs[id(module)] = self._get_output(module, lib_type, mode_path)
+                    targets.append((module, lib_type))
+        for module, lib_type in targets:
+            target_name = f"{module.get_owner_project().get_name()}::{module.get_name()}"
+            content.append(f"# Module: {target_name}")
+            if lib_type == "INTERFACE":
+                content.extend([f"build {_ninja_path(target_name)}: phony", ""])
+                continue
+            # What the module uses itself plus the usage requirements of it and its depends
+            usage_includes, usage_macros, usage_sources, external_flags, usage_pch = self._get_usage(module, mode_mask, usage)
+            includes = list(module.get_public_include_files() or []) + list(module.get_private_include_files() or []) + usage_includes
+            private_macros = list(dict.fromkeys(module.get_private_macros() + module.get_owner_project().get_private_macros())) if module.get_private_macros() else []
+            macros = usage_macros + private_macros
+            sources = list(module.get_public_source_files() or []) + list(module.get_private_source_files() or []) + usage_sources
+            flags = [f"-I{include}" for include in dict.fromkeys(includes)] + [f"-D{macro}" for macro in dict.fromkeys(macros)] + \
+                    [flag for flag in external_flags if flag.startswith("-I")]
+            if lib_type == "SHARED":
+                flags.append("-fPIC")
+            compile_flags = flags
+            pch_header, pch_entries = self._get_pch(module, list(module.get_private_pch() or []) + usage_pch, mode_mask, build_dir, outputs)
+            pch_implicit = ""
+            if pch_header is not None:
+                if pch_entries:
+                    pch_header.parent.mkdir(parents=True, exist_ok=True)
+                    get_artifact_store(self.project.get_cache_dir()).write(pch_header, "".join(
+                        f"#include {entry}\n" if str(entry).startswith("<") else f'#include "{str(entry).replace(os.sep, "/")}"\n' for entry in pch_entries))
+                    content.append(f"build {_ninja_path(pch_header)}.gch: pch {_ninja_path(pch_header)}")
+                    content.append(f"  flags = {_ninja_args(flags)}")
+                compile_flags = flags + ["-include", str(pch_header), "-Winvalid-pch"]
+                pch_implicit = f" | {_ninja_path(pch_header)}.gch"
+            objects = []
+            compile_sources = sorted(set(str(source) for source in sources if str(source).endswith(ninja_cxx_extensions)))
+            compile_units = [(source, self._get_object(module, source)) for source in compile_sources]
+            if module.get_unity_build() and mode.get('unity_build', True):
+                compile_units = self._get_unity_units(module, compile_sources, build_dir)
+            for source, obj in compile_units:
+                objects.append(obj)
+                content.append(f"build {_ninja_path(obj)}: cxx {_ninja_path(source)}{pch_implicit}")
+                content.append(f"  flags = {_ninja_args(compile_flags)}")
+            output = outputs[id(module)]
+            if lib_type == "STATIC":
+                content.append(f"build {_ninja_path(output)}: ar {' '.join(_ninja_path(obj) for obj in objects)}")
+            else:
+                linked = [outputs[id(dep)] for dep in self._get_link_closure(module, mode_mask) if id(dep) in outputs]
+                libs = [str(path) for path in linked]
+                if sys.platform != "win32":
+                    libs += [f"-Wl,-rpath,{directory}" for directory in dict.fromkeys(str(path.parent) for path in linked if path.suffix in (".so", ".dylib"))]
+                libs += [flag for flag in external_flags if not flag.startswith("-I")]
+                rule = "link" if lib_type == "EXECUTABLE" else "link_shared"
+                implicit = f" | {' '.join(_ninja_path(path) for path in linked)}" if linked else ""
+                content.append(f"build {_ninja_path(output)}: {rule} {' '.join(_ninja_path(obj) for obj in objects)}{implicit}")
+                content.append(f"  libs = {_ninja_args(libs)}")
+            content.extend([f"build {_ninja_path(target_name)}: phony {_ninja_path(output)}", ""])
+        content.append(f"build all: phony {' '.join(_ninja_path(path) for path in outputs.values())}")
+        content.append("default all")
+        content.append("")
+        return content
+
+    def generate_makefile(self):
+        print(f"--- Starting generation of build.ninja files for project {self.project.get_name()} ---")
+        project_graph = build_project_dependency_graph(self.project)
+        projects = [project for level in project_graph.get_levels() for project in level]
+        build_module_dependency_graph(projects).check_acyclic()
+        store = get_artifact_store(self.project.get_cache_dir())
+        for mode in self.build_modes:
+            build_dir = self._get_build_dir(mode.get('name'))
+            build_dir.mkdir(parents=True, exist_ok=True)
+            content = self._generate_mode(mode, projects, build_dir)
+            if store.write(build_dir / "build.ninja", "\n".join(content)):
+                print(f"Successfully generated build.ninja file at: {build_dir}")
+            else:
+                print(f"build.ninja file at: {build_dir} is up to date")
+        print(f"--- Finished generating build.ninja files for project {self.project.get_name()} ---")
+
+    def clean_makefile(self):
+        self.project.get_makefile_generator().clean_makefile()
+
+graph_generators:dict[str,type[MakefileGeneratorBase]] = {"superbuild": SuperbuildGenerator, "ninja": NinjaGenerator}
+
 ###############################################################################################################        
 
 class ExternalModuleDefinition(ExternalModuleDefinitionBase):
@@ -887,6 +2617,7 @@ class ExternalModuleDefinition(ExternalModuleDefinitionBase):
                  ): 
         ExternalModuleDefinitionBase.__init__(self,name,path)
         self.condition_keys = condition_keys if condition_keys is not None else ["InstallAlways"]
+        self.condition_mask = key_table.get_mask(self.condition_keys)
         if library_type is None:
             raise AttributeError(f"an ExternalModuleDefinition named as {name} not found library_type")
         self.library_name = library_name if library_name is not None else name
@@ -919,6 +2650,9 @@ class ExternalModuleDefinition(ExternalModuleDefinitionBase):
     def get_condition_keys(self) -> list[str]:
         return self.condition_keys
     
+    def get_condition_mask(self) -> int:
+        return self.condition_mask
+    
     def get_library_name(self)->str:
         return self.library_name
 
@@ -940,6 +2674,7 @@ class ExternalProjectDefinition(ExternalProjectDefinitionBase):
         self.project_type = project_type if project_type is not None else "Package"
         self.package_name = package_name if package_name is not None else name
         self.condition_keys = condition_keys if condition_keys is not None else ["InstallAlways"]
+        self.condition_mask = key_table.get_mask(self.condition_keys)
         if install_dir is None:
             raise AttributeError(f"an ExternalProjectDefinition named as {name} not found install_dir")
         self.row_install_dir = install_dir
@@ -978,6 +2713,9 @@ class ExternalProjectDefinition(ExternalProjectDefinitionBase):
     def get_condition_keys(self) -> list[str]:
         return self.condition_keys
     
+    def get_condition_mask(self) -> int:
+        return self.condition_mask
+    
     def get_modules(self) -> list[ExternalModuleDefinitionBase]:
         return self.modules
     
@@ -1000,10 +2738,20 @@ class ModuleDefinition(ModuleDefinitionBase):
                  public_depends_modules:list[ModuleDependencyBase] = None,
                  private_depends_modules:list[ModuleDependencyBase] = None,
                  public_external_depends:list[ExternalModuleDependencyBase] = None,
-                 private_external_depends:list[ExternalModuleDependencyBase] = None
+                 private_external_depends:list[ExternalModuleDependencyBase] = None,
+                 source_extensions:list[str] = None,
+                 exclude:list[str] = None,
+                 glob_sources:bool = None,
+                 unity_build:bool = None,
+                 unity_batch_size:int = None,
+                 unity_exclude:list[str] = None,
+                 public_pch:list[Path|str] = None,
+                 private_pch:list[Path|str] = None,
+                 pch_reuse_from:ModuleDependencyBase = None
                  ): 
         ModuleDefinitionBase.__init__(self,name,path)
         self.condition_keys = condition_keys if condition_keys is not None else ["InstallAlways"]
+        self.condition_mask = key_table.get_mask(self.condition_keys)
         if library_type is None:
             raise AttributeError(f"an ModuleDefinition named as {name} not found library_type")
         self.library_type = library_type
@@ -1017,36 +2765,55 @@ class ModuleDefinition(ModuleDefinitionBase):
         self.private_depends_modules = private_depends_modules if private_depends_modules is not None else []
         self.public_external_depends = public_external_depends if public_external_depends is not None else []
         self.private_external_depends = private_external_depends if private_external_depends is not None else []
+        self.source_extensions = source_extensions
+        self.exclude = exclude
+        self.glob_sources = glob_sources
+        self.unity_build = unity_build
+        self.unity_batch_size = unity_batch_size
+        self.unity_exclude = unity_exclude if unity_exclude is not None else [] # same patterns as exclude,sources compiled on their own
+        self.row_public_pch = public_pch if public_pch is not None else [] # headers,or <system> headers kept as written
+        self.row_private_pch = private_pch if private_pch is not None else []
+        self.pch_reuse_from = pch_reuse_from
         self.owner_project:ProjectDefinitionBase = None
-        self._init_real_paths()
+        self.real_paths_inited = False
+        
+    def _ensure_real_paths(self):
+        # Sources are only scanned once the generator asks for them,so modules that are never generated cost nothing
+        if not self.real_paths_inited:
+            self._init_real_paths()
         
     def _init_real_paths(self):
         self.public_source:list[Path|str] = []
         self.private_source:list[Path|str] = []
         self.public_include:list[Path|str] = []
         self.private_include:list[Path|str] = []
+        owner_project = self.get_owner_project()
+        snapshot = owner_project.get_source_snapshot() if owner_project is not None else None
+        source_filter = self.get_source_filter()
+        def find_files(path):
+            if snapshot is not None:
+                return snapshot.find_files(path, source_filter)
+            return _find_files(path, None, source_filter)
         for row_public_source_file in self.row_public_source_files:
-            self.public_source.extend(_find_files(self._to_abs_path(row_public_source_file)))
+            self.public_source.extend(find_files(self._to_abs_path(row_public_source_file)))
         for row_private_source_file in self.row_private_source_files:
-            self.private_source.extend(_find_files(self._to_abs_path(row_private_source_file)))
+            self.private_source.extend(find_files(self._to_abs_path(row_private_source_file)))
         for row_public_include_dir in self.row_public_include_dirs:
             self.public_include.append(self._to_abs_path(row_public_include_dir))
         for row_private_include_dir in self.row_private_include_dirs:
             self.private_include.append(self._to_abs_path(row_private_include_dir))
+        self.real_paths_inited = True
         return
     
     def _set_owner(self,owner):
         self.owner_project = owner
         
     def _init_dependency(self):
-        for m in self.public_depends_modules:
-            m._init_real()
-        for m in self.private_depends_modules:
-            m._init_real()
-        for m in self.public_external_depends:
-            m._init_real()
-        for m in self.private_external_depends:
-            m._init_real()
+        for m in self.public_depends_modules + self.private_depends_modules + self.public_external_depends + self.private_external_depends:
+            if _is_generation_active(m.required_mask):
+                m._init_real()
+        if self.pch_reuse_from is not None and _is_generation_active(self.pch_reuse_from.required_mask):
+            self.pch_reuse_from._init_real()
         return
         
     def _check_dependency_legitimacy(self):
@@ -1058,65 +2825,58 @@ class ModuleDefinition(ModuleDefinitionBase):
         all_external_dependencies = self.public_external_depends + self.private_external_depends
 
         for dep in all_module_dependencies:
+            if not _is_generation_active(dep.required_mask):
+                continue
             dep_module = dep.module
             if dep_module.get_library_type().upper() == "EXECUTABLE":
                 raise ValueError(
                     f"Module '{owner_project.get_name()}::{self.get_name()}' dependency on '{dep_module.get_owner_project().get_name()}::{dep_module.get_name()}',but {dep_module.get_name()} is an EXECUTABLE module. "
                 )                
-            if not set(dep.required_keys).issubset(set(dep_module.get_condition_keys())):
+            if dep.required_mask & ~dep_module.get_condition_mask():
                 raise ValueError(
                     f"Module '{owner_project.get_name()}::{self.get_name()}' dependency on '{dep_module.get_owner_project().get_name()}::{dep_module.get_name()}' has invalid required keys. "
                     f"Required keys '{dep.required_keys}' are not a subset of '{dep_module.get_condition_keys()}'."
                 )
 
-            is_legit_dependency = False
-            
-            if dep_module in owner_project.get_public_modules() or dep_module in owner_project.get_private_modules():
-                is_legit_dependency = True
-
-            if not is_legit_dependency:
-                checked_projects = set()
-                
-                def check_transitive_dependencies(project_dep):
-                    nonlocal is_legit_dependency
-                    project = project_dep.project
-                    if project in checked_projects:
-                        return
-                    checked_projects.add(project)
-                    
-                    if dep_module in project.get_public_modules() or dep_module in project.get_private_modules():
-                        is_legit_dependency = True
-                        return
-
-                    for transitive_dep in project.get_public_depends():
-                        if not is_legit_dependency:
-                            check_transitive_dependencies(transitive_dep)
-
-                for direct_dep in owner_project.get_public_depends():
-                    if is_legit_dependency:
-                        break
-                    check_transitive_dependencies(direct_dep)
-
-            if not is_legit_dependency:
+            if not project_reachability.can_depend_on(owner_project, dep_module):
                 raise ValueError(
                     f"Module '{owner_project.get_name()}::{self.get_name()}' has an illegal dependency on module '{dep_module.get_owner_project().get_name()}::{dep_module.get_name()}'. "
                     f"Dependencies must be sub-modules of the owner project or its public dependencies."
                 )
 
         for dep in all_external_dependencies:
+            if not _is_generation_active(dep.required_mask):
+                continue
             dep_external_module = dep.module
             
-            if not set(dep.required_keys).issubset(set(dep_external_module.get_condition_keys())):
+            if dep.required_mask & ~dep_external_module.get_condition_mask():
                 raise ValueError(
                     f"Module '{owner_project.get_name()}::{self.get_name()}' dependency on external module '{dep_external_module.get_owner_project().get_name()}::{dep_external_module.get_name()}' has invalid required keys. "
                     f"Required keys '{dep.required_keys}' are not a subset of '{dep_external_module.get_condition_keys()}'."
                 )
+
+        reuse_dep = self.pch_reuse_from
+        if reuse_dep is not None and _is_generation_active(reuse_dep.required_mask):
+            reuse_module = reuse_dep.module
+            reuse_name = f"{reuse_module.get_owner_project().get_name()}::{reuse_module.get_name()}"
+            if self.row_public_pch or self.row_private_pch:
+                own_pch = "public_pch" if self.row_public_pch else "private_pch"
+                raise ValueError(f"Module '{owner_project.get_name()}::{self.get_name()}' sets both {own_pch} and pch_reuse_from '{reuse_name}',a reused precompiled header replaces its own.")
+            if not reuse_module.get_public_pch() and not reuse_module.get_private_pch():
+                raise ValueError(f"Module '{owner_project.get_name()}::{self.get_name()}' reuses the precompiled header of '{reuse_name}',which declares no public_pch or private_pch.")
+            if reuse_module.get_library_type().upper() == "INTERFACE":
+                raise ValueError(f"Module '{owner_project.get_name()}::{self.get_name()}' reuses the precompiled header of the INTERFACE module '{reuse_name}',which compiles none.")
+            if not project_reachability.can_depend_on(owner_project, reuse_module):
+                raise ValueError(
+                    f"Module '{owner_project.get_name()}::{self.get_name()}' reuses the precompiled header of '{reuse_name}',which it can not depend on. "
+                    f"Dependencies must be sub-modules of the owner project or its public dependencies."
+                )
         return
 
         all_external_dependencies = self.public_external_depends + self.private_external_depends
         for dep in all_external_dependencies:
             dep_external_module = dep.module
-            if not set(dep.required_keys).issubset(set(dep_external_module.get_condition_keys())):
+            if dep.required_mask & ~dep_external_module.get_condition_mask():
                 raise ValueError(
                     f"External dependency '{dep_external_module.get_owner_project().get_name()}::{dep_external_module.get_name()}' in module '{owner_project.get_name()}::{self.get_name()}' has invalid required keys. "
                     f"Required keys '{dep.required_keys}' are not a subset of '{dep_external_module.get_condition_keys()}'."
@@ -1131,19 +2891,26 @@ class ModuleDefinition(ModuleDefinitionBase):
     def get_condition_keys(self) -> list[str]:
         return self.condition_keys
     
+    def get_condition_mask(self) -> int:
+        return self.condition_mask
+    
     def get_library_type(self)->str:
         return self.library_type
         
     def get_public_source_files(self) -> list[Path|str]:#not include inherit from depends
+        self._ensure_real_paths()
         return self.public_source
     
     def get_private_source_files(self) -> list[Path|str]:
+        self._ensure_real_paths()
         return self.private_source
     
     def get_public_include_files(self) -> list[Path|str]:#not include inherit from depends
+        self._ensure_real_paths()
         return self.public_include
     
     def get_private_include_files(self) -> list[Path|str]:
+        self._ensure_real_paths()
         return self.private_include
     
     def get_public_macros(self) -> list[str]:
@@ -1167,6 +2934,63 @@ class ModuleDefinition(ModuleDefinitionBase):
     def get_owner_project(self) -> ProjectDefinitionBase:
         return self.owner_project
     
+    def get_source_extensions(self) -> list[str]:
+        if self.source_extensions is None and self.owner_project is not None:
+            return self.owner_project.get_source_extensions()
+        return self.source_extensions
+    
+    def get_exclude(self) -> list[str]:
+        if self.exclude is None and self.owner_project is not None:
+            return self.owner_project.get_exclude()
+        return self.exclude
+    
+    def get_public_source_entries(self) -> list[Path]:
+        return [self._to_abs_path(row) for row in self.row_public_source_files]
+    
+    def get_private_source_entries(self) -> list[Path]:
+        return [self._to_abs_path(row) for row in self.row_private_source_files]
+    
+    def get_source_entries(self) -> list[Path]:
+        return self.get_public_source_entries() + self.get_private_source_entries()
+    
+    def get_glob_sources(self) -> bool:
+        if self.glob_sources is None and self.owner_project is not None:
+            return self.owner_project.get_glob_sources()
+        return bool(self.glob_sources)
+    
+    def get_unity_build(self) -> bool:
+        if self.unity_build is None and self.owner_project is not None:
+            return self.owner_project.get_unity_build()
+        return bool(self.unity_build)
+    
+    def get_unity_batch_size(self) -> int:
+        if self.unity_batch_size is None and self.owner_project is not None:
+            return self.owner_project.get_unity_batch_size()
+        return self.unity_batch_size
+    
+    def get_unity_exclude(self) -> list[str]:
+        return self.unity_exclude
+    
+    def _to_pch_entry(self, entry:Path|str) -> Path|str:
+        return entry if str(entry).startswith("<") else self._to_abs_path(entry)
+    
+    def get_public_pch(self) -> list[Path|str]:
+        return [self._to_pch_entry(entry) for entry in self.row_public_pch]
+    
+    def get_private_pch(self) -> list[Path|str]:
+        return [self._to_pch_entry(entry) for entry in self.row_private_pch]
+    
+    def get_pch_reuse_from(self) -> ModuleDependencyBase:
+        return self.pch_reuse_from
+    
+    def get_source_filter(self) -> SourceFilter:
+        """Filter for directory and glob source entries,None when neither the module nor its project sets one."""
+        source_extensions = self.get_source_extensions()
+        exclude = self.get_exclude()
+        if source_extensions is None and not exclude:
+            return None
+        return SourceFilter(source_extensions, exclude, self.path)
+    
 class ProjectDefinition(ProjectDefinitionBase):
     def __init__(self, name: str = None, path: Path|str = None,
                  condition_keys:list[str] = None,
@@ -1184,10 +3008,19 @@ class ProjectDefinition(ProjectDefinitionBase):
                  private_depends:list[ProjectDependencyBase] = None,
                  sub_project:list[ProjectDefinitionBase] = None,
                  public_external_depends:list[ExternalModuleDependencyBase] = None,
-                 private_external_depends:list[ExternalModuleDependencyBase] = None                 
+                 private_external_depends:list[ExternalModuleDependencyBase] = None,
+                 source_extensions:list[str] = None,
+                 exclude:list[str] = None,
+                 glob_sources:bool = False,
+                 reduce_link_edges:bool = False,
+                 resolve_keys:bool = False,
+                 module_fragments:bool = False,
+                 unity_build:bool = False,
+                 unity_batch_size:int = None
                  ): 
         ProjectDefinitionBase.__init__(self,name,path)
         self.condition_keys = condition_keys if condition_keys is not None else ["InstallAlways"]
+        self.condition_mask = key_table.get_mask(self.condition_keys)
         if binarys_dir is None:
             print(f"A project named as '{name}' has no set binarys_dir,use default '{default_binarys_dir}'")
             self.row_binarys_dir = default_binarys_dir
@@ -1223,8 +3056,29 @@ class ProjectDefinition(ProjectDefinitionBase):
         self.sub_project = sub_project if sub_project is not None else []
         self.public_external_depends = public_external_depends if public_external_depends is not None else []
         self.private_external_depends = private_external_depends if private_external_depends is not None else []
+        self.source_extensions = source_extensions # default for modules that set no source_extensions
+        self.exclude = exclude # default for modules that set no exclude
+        self.glob_sources = glob_sources # default for modules that set no glob_sources
+        self.reduce_link_edges = reduce_link_edges
+        self.resolve_keys = resolve_keys # check condition keys per build mode at generation instead of at configure time
+        self.module_fragments = module_fragments # emit each module to cache_dir/cmake/<module>.cmake
+        self.unity_build = unity_build # default for modules that set no unity_build
+        self.unity_batch_size = unity_batch_size # default for modules that set no unity_batch_size
+        self.source_snapshot:ProjectSourceSnapshot = None
+        self.source_snapshot_lock = threading.Lock()
         self._init_real_paths()
         self._set_modules_owner()
+
+    def __getstate__(self):
+        # The snapshot is rebuilt from the source index on demand,never pickled with the graph
+        state = self.__dict__.copy()
+        state['source_snapshot'] = None
+        del state['source_snapshot_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.source_snapshot_lock = threading.Lock()
     
     def _init_real_paths(self):
         self.binarys_dir:Path|str = self._to_abs_path(self.row_binarys_dir)
@@ -1253,10 +3107,9 @@ class ProjectDefinition(ProjectDefinitionBase):
             module._set_owner(self)
 
     def _init_dependency(self):
-        for m in self.public_modules:
-            m._init_dependency()
-        for m in self.private_modules:
-            m._init_dependency()
+        for m in self.public_modules + self.private_modules:
+            if _is_generation_active(m.get_condition_mask()):
+                m._init_dependency()
         for p in self.public_depends:
             p._init_real()
         for p in self.private_depends:
@@ -1273,7 +3126,7 @@ class ProjectDefinition(ProjectDefinitionBase):
 
         for dep in all_project_dependencies:
             dep_project = dep.project
-            if not set(dep.required_keys).issubset(set(dep_project.get_condition_keys())):
+            if dep.required_mask & ~dep_project.get_condition_mask():
                 raise ValueError(
                     f"Project '{self.get_name()}' dependency on '{dep_project.get_name()}' has invalid required keys. "
                     f"Required keys '{dep.required_keys}' are not a subset of '{dep_project.get_condition_keys()}'."
@@ -1281,7 +3134,7 @@ class ProjectDefinition(ProjectDefinitionBase):
 
         for dep in all_external_dependencies:
             dep_external_project = dep.project
-            if not set(dep.required_keys).issubset(set(dep_external_project.get_condition_keys())):
+            if dep.required_mask & ~dep_external_project.get_condition_mask():
                 raise ValueError(
                     f"Project '{self.get_name()}' dependency on external project '{dep_external_project.get_name()}' has invalid required keys. "
                     f"Required keys '{dep.required_keys}' are not a subset of '{dep_external_project.get_condition_keys()}'."
@@ -1289,13 +3142,17 @@ class ProjectDefinition(ProjectDefinitionBase):
 
         all_sub_modules = self.get_public_modules() + self.get_private_modules()
         for module in all_sub_modules:
-            module._check_dependency_legitimacy()
+            if _is_generation_active(module.get_condition_mask()):
+                module._check_dependency_legitimacy()
 
         return
     
     def get_condition_keys(self) -> list[str]:
         return self.condition_keys
     
+    def get_condition_mask(self) -> int:
+        return self.condition_mask
+    
     def get_binarys_dir(self) -> Path|str:
         return self.binarys_dir
     
@@ -1308,6 +3165,60 @@ class ProjectDefinition(ProjectDefinitionBase):
     def get_install_dir(self) -> Path|str:
         return self.install_dir
     
+    def get_source_extensions(self) -> list[str]:
+        return self.source_extensions
+    
+    def get_exclude(self) -> list[str]:
+        return self.exclude
+    
+    def get_glob_sources(self) -> bool:
+        return self.glob_sources
+    
+    def get_reduce_link_edges(self) -> bool:
+        return self.reduce_link_edges
+    
+    def get_resolve_keys(self) -> bool:
+        return self.resolve_keys
+    
+    def get_module_fragments(self) -> bool:
+        return self.module_fragments
+    
+    def get_unity_build(self) -> bool:
+        return self.unity_build
+    
+    def get_unity_batch_size(self) -> int:
+        return self.unity_batch_size
+    
+    def get_source_snapshot(self) -> ProjectSourceSnapshot:
+        """A single walk of the project tree,shared by all modules of this project."""
+        with self.source_snapshot_lock:
+            if self.source_snapshot is None:
+                skip_dirs = [self.binarys_dir, self.archive_dir, self.cache_dir, self.install_dir, self.path / "build"]
+                skip_dirs.extend(sub.get_path() for sub in self.sub_project)
+                self.source_snapshot = ProjectSourceSnapshot(self.path, get_source_index(self.cache_dir), skip_dirs,
+                                                             prune_filter = self._get_prune_filter())
+            return self.source_snapshot
+    
+    def _get_prune_filter(self) -> SourceFilter:
+        """Directories excluded by the project or by any of its modules,the snapshot does not walk them.
+        A module that does not exclude such a directory still gets it,the snapshot lists it once an entry reaches it."""
+        exclude = list(self.get_exclude() or [])
+        for module in self.public_modules + self.private_modules:
+            if isinstance(module, LazyModuleDefinition) and module.condition_mask is not None and not _is_generation_active(module.condition_mask):
+                continue # inactive,its definition is not run just for its excludes
+            rel_module_path = os.path.relpath(module.get_path(), self.path).replace(os.sep, '/')
+            for pattern in module.get_exclude() or []:
+                if '/' not in pattern:
+                    exclude.append(pattern)
+                elif rel_module_path != '..' and not rel_module_path.startswith('../'):
+                    exclude.append(pattern.strip('/') if rel_module_path == '.' else f"{rel_module_path}/{pattern.strip('/')}")
+        if not exclude:
+            return None
+        return SourceFilter(None, list(dict.fromkeys(exclude)), self.path)
+
+    def invalidate_source_snapshot(self):
+        self.source_snapshot = None
+    
     def get_should_install(self) ->bool:
         return self.should_install
         
@@ -1360,8 +3271,154 @@ def get_all_project_depend(project:ProjectDefinitionBase):
 
 ##############################################################################################################
 
-all_extronal_projects_map:map = {}
-all_extronal_projects_Path_map:map = {}
+class ProjectRegistry:
+    """Indexed registry of the loaded projects,their modules and the external projects.
+    Modules are found in O(1) by qualified 'Project::Module' name,by path or by owner project.
+    all_projects_map and all_extronal_projects_map are the registry's own name maps,so always register through it."""
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.projects:dict[str,ProjectDefinitionBase] = {}
+        self.project_paths:dict[Path,str] = {}
+        self.external_projects:dict[str,ExternalProjectDefinitionBase] = {}
+        self.external_project_paths:dict[Path,str] = {}
+        self.modules:dict[str,ModuleDefinitionBase] = {}
+        self.module_paths:dict[str,ModuleDefinitionBase] = {}
+        self.module_owners:dict[int,ProjectDefinitionBase] = {}
+        self.project_modules:dict[str,set[str]] = {}
+        self.public_project_modules:dict[str,set[str]] = {}
+        self.external_modules:dict[str,ExternalModuleDefinitionBase] = {}
+
+    @staticmethod
+    def qualified_name(project_name:str, module_name:str) -> str:
+        return f"{project_name}::{module_name}"
+
+    @staticmethod
+    def _path_key(path:Path|str) -> str:
+        return os.path.normcase(os.path.normpath(str(path)))
+
+    def _index_modules(self, project:ProjectDefinitionBase):
+        project_name = project.get_name()
+        public_modules = project.get_public_modules() or []
+        private_modules = project.get_private_modules() or []
+        self.project_modules[project_name] = set()
+        self.public_project_modules[project_name] = {m.get_name() for m in public_modules}
+        # Private modules first,so a name declared twice resolves like from_name_get_module did
+        for module in private_modules + public_modules:
+            self.project_modules[project_name].add(module.get_name())
+            self.modules.setdefault(self.qualified_name(project_name, module.get_name()), module)
+            self.module_paths.setdefault(self._path_key(module.path), module)
+            self.module_owners[id(module)] = project
+
+    def _index_external_modules(self, project:ExternalProjectDefinitionBase):
+        for module in project.get_modules() or []:
+            self.external_modules.setdefault(self.qualified_name(project.get_name(), module.get_name()), module)
+
+    def register_project(self, project:ProjectDefinitionBase):
+        with self.lock:
+            project_name = project.get_name()
+            if project_name in self.projects:
+                old_project_def:ProjectDefinitionBase = self.projects[project_name]
+                raise AttributeError(f"Two project have same name,but form diferent path:{old_project_def.get_path()}::{project.get_path()}")
+            self.projects[project_name] = project
+            self._index_modules(project)
+
+    def unregister_project(self, project_name:str):
+        with self.lock:
+            if self.projects.pop(project_name, None) is None:
+                return
+            for module_name in self.project_modules.pop(project_name, set()):
+                module = self.modules.pop(self.qualified_name(project_name, module_name), None)
+                if module is not None:
+                    self.module_paths.pop(self._path_key(module.path), None)
+                    self.module_owners.pop(id(module), None)
+            self.public_project_modules.pop(project_name, None)
+
+    def register_external_project(self, project:ExternalProjectDefinitionBase):
+        with self.lock:
+            project_name = project.get_name()
+            if project_name in self.external_projects:
+                old_project_def:ExternalProjectDefinitionBase = self.external_projects[project_name]
+                raise AttributeError(f"Two project have same name,but form diferent path:{old_project_def.get_path()}::{project.get_path()}")
+            self.external_projects[project_name] = project
+            self._index_external_modules(project)
+
+    def unregister_external_project(self, project_name:str):
+        with self.lock:
+            project = self.external_projects.pop(project_name, None)
+            if project is None:
+                return
+            for module in project.get_modules() or []:
+                self.external_modules.pop(self.qualified_name(project_name, module.get_name()), None)
+
+    def reindex(self):
+        """Rebuilds the module indexes from the name maps,after they were restored from the graph cache."""
+        with self.lock:
+            for index in (self.modules, self.module_paths, self.module_owners, self.project_modules,
+                          self.public_project_modules, self.external_modules):
+                index.clear()
+            for project in self.projects.values():
+                self._index_modules(project)
+            for project in self.external_projects.values():
+                self._index_external_modules(project)
+
+    def clear(self):
+        with self.lock:
+            for project_map in (self.projects, self.project_paths, self.external_projects, self.external_project_paths):
+                project_map.clear()
+            self.reindex()
+
+    def find_project(self, project_name:str) -> ProjectDefinitionBase:
+        return self.projects.get(project_name)
+
+    def find_external_project(self, project_name:str) -> ExternalProjectDefinitionBase:
+        return self.external_projects.get(project_name)
+
+    def find_module(self, project_name:str, module_name:str) -> ModuleDefinitionBase:
+        module = self.modules.get(self.qualified_name(project_name, module_name))
+        if module is None and project_name in self.projects:
+            # A lazy module named unlike its directory is only indexed by its real name once its definition ran
+            project = self.projects[project_name]
+            if _resolve_provisional_modules((project.get_private_modules() or []) + (project.get_public_modules() or [])):
+                module = self.modules.get(self.qualified_name(project_name, module_name))
+        return module
+
+    def find_module_by_qualified_name(self, qualified_name:str) -> ModuleDefinitionBase:
+        project_name, _, module_name = qualified_name.partition("::")
+        return self.find_module(project_name, module_name)
+
+    def rename_module(self, project_name:str, module:ModuleDefinitionBase, old_name:str):
+        """Re-keys a module indexed under old_name by its current name,a lazy module's directory name is only provisional."""
+        with self.lock:
+            if self.modules.get(self.qualified_name(project_name, old_name)) is not module:
+                return
+            del self.modules[self.qualified_name(project_name, old_name)]
+            self.modules.setdefault(self.qualified_name(project_name, module.get_name()), module)
+            for names in (self.project_modules.get(project_name), self.public_project_modules.get(project_name)):
+                if names is not None and old_name in names:
+                    names.discard(old_name)
+                    names.add(module.get_name())
+
+    def find_module_by_path(self, module_path:Path|str) -> ModuleDefinitionBase:
+        return self.module_paths.get(self._path_key(module_path))
+
+    def find_external_module(self, project_name:str, module_name:str) -> ExternalModuleDefinitionBase:
+        return self.external_modules.get(self.qualified_name(project_name, module_name))
+
+    def get_owner(self, module:ModuleDefinitionBase) -> ProjectDefinitionBase:
+        owner = self.module_owners.get(id(module))
+        return owner if owner is not None else module.get_owner_project()
+
+    def get_project_modules(self, project_name:str) -> set[str]:
+        """Names of every module of a project."""
+        return self.project_modules.get(project_name, set())
+
+    def get_public_project_modules(self, project_name:str) -> set[str]:
+        return self.public_project_modules.get(project_name, set())
+
+project_registry = ProjectRegistry()
+
+all_extronal_projects_map:map = project_registry.external_projects
+all_extronal_projects_Path_map:map = project_registry.external_project_paths
 
 def load_extronal_project(abs_project_dir: Path|str) -> ExternalProjectDefinitionBase:
     global all_extronal_projects_map
@@ -1382,14 +3439,11 @@ def load_extronal_project(abs_project_dir: Path|str) -> ExternalProjectDefinitio
     project_def.RootPath = abs_project_path
     print(f"Loading project: {project_def.get_name()}")
     project_name = project_def.get_name()
-    if project_name in all_extronal_projects_map:
-        old_project_def:ExternalProjectDefinitionBase = all_extronal_projects_map[project_name]
-        raise AttributeError(f"Two project have same name,but form diferent path:{old_project_def.get_path()}::{project_def.get_path()}")
-    all_extronal_projects_map[project_name] = project_def
+    project_registry.register_external_project(project_def)
     try:
         project_def._init_dependency()
     except Exception as e:
-        del all_extronal_projects_map[project_name]
+        project_registry.unregister_external_project(project_name)
         raise AttributeError(f"An error occurred during project loading: {e}")
     print(f"Loaded project: {project_name}")
     all_extronal_projects_Path_map[abs_project_path] = project_name
@@ -1410,12 +3464,402 @@ def load_extronal_module(abs_module_dir: Path|str) -> ExternalModuleDefinitionBa
         
     return module_def
 
-all_projects_map:map = {}
-all_projects_Path_map:map = {}
+all_projects_map:map = project_registry.projects
+all_projects_Path_map:map = project_registry.project_paths
+
+class ProjectReachability:
+    """Public reachability closure of the project graph as per-project bitmasks.
+    A project's mask holds its own bit and the bits of every project reachable through its public depends,
+    so whether a module may be depended on is a single AND instead of a walk over the graph."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.projects:list[ProjectDefinitionBase] = [] # keeps the projects alive,so their ids stay unique
+        self.bits:dict[int,int] = {}
+        self.closures:dict[int,int] = {}
+
+    def get_bit(self, project:ProjectDefinitionBase) -> int:
+        bit = self.bits.get(id(project))
+        if bit is None:
+            bit = self.bits[id(project)] = 1 << len(self.projects)
+            self.projects.append(project)
+        return bit
+
+    @staticmethod
+    def _public_targets(project:ProjectDefinitionBase) -> list[ProjectDefinitionBase]:
+        targets = []
+        for dep in project.get_public_depends() or []:
+            dep._init_real() # transitive dependencies may not have been resolved by their own project yet
+            targets.append(dep.project)
+        return targets
+
+    def get_closure(self, project:ProjectDefinitionBase) -> int:
+        closure = self.closures.get(id(project))
+        if closure is not None:
+            return closure
+        # Post-order over the part of the graph not computed yet,so an acyclic graph settles in a single pass
+        edges:dict[int,list[ProjectDefinitionBase]] = {id(project): self._public_targets(project)}
+        post_order:list[ProjectDefinitionBase] = []
+        seen = {id(project)}
+        stack = [(project, iter(edges[id(project)]))]
+        while stack:
+            current, targets = stack[-1]
+            for target in targets:
+                if id(target) not in seen and id(target) not in self.closures:
+                    seen.add(id(target))
+                    edges[id(target)] = self._public_targets(target)
+                    stack.append((target, iter(edges[id(target)])))
+                    break
+            else:
+                stack.pop()
+                post_order.append(current)
+        masks = {id(p): self.get_bit(p) for p in post_order}
+        changed = True
+        while changed: # further passes are only needed for public dependency cycles
+            changed = False
+            for p in post_order:
+                mask = masks[id(p)]
+                for target in edges[id(p)]:
+                    mask |= masks[id(target)] if id(target) in masks else self.closures[id(target)]
+                if mask != masks[id(p)]:
+                    masks[id(p)] = mask
+                    changed = True
+        self.closures.update(masks)
+        return masks[id(project)]
+
+    def can_depend_on(self, owner_project:ProjectDefinitionBase, dep_module:ModuleDefinitionBase) -> bool:
+        """A module may depend on modules of its own project and of projects reachable through public depends."""
+        dep_project = project_registry.get_owner(dep_module)
+        if dep_project is None:
+            return False
+        return bool(self.get_closure(owner_project) & self.get_bit(dep_project))
+
+project_reachability = ProjectReachability()
+
+class DependencyGraph:
+    """Directed graph over projects or modules,edges point from a dependent to its dependencies.
+    Strongly connected components come from an iterative Tarjan,so deep graphs never hit the recursion limit."""
+    def __init__(self, nodes:list, edges:dict[int,list], get_name, kind:str):
+        self.nodes = nodes
+        self.edges = edges # id(node) -> dependency nodes
+        self.get_name = get_name
+        self.kind = kind
+        self.components:list[list] = None
+
+    def get_components(self) -> list[list]:
+        """Components in dependency order: a component only comes after every component it depends on."""
+        if self.components is not None:
+            return self.components
+        index_of:dict[int,int] = {}
+        low_link:dict[int,int] = {}
+        on_stack:set[int] = set()
+        stack:list = []
+        components:list[list] = []
+        for start in self.nodes:
+            if id(start) in index_of:
+                continue
+            index_of[id(start)] = low_link[id(start)] = len(index_of)
+            stack.append(start)
+            on_stack.add(id(start))
+            work = [(start, iter(self.edges.get(id(start), [])))]
+            while work:
+                node, targets = work[-1]
+                descended = False
+                for target in targets:
+                    if id(target) not in index_of:
+                        index_of[id(target)] = low_link[id(target)] = len(index_of)
+                        stack.append(target)
+                        on_stack.add(id(target))
+                        work.append((target, iter(self.edges.get(id(target), []))))
+                        descended = True
+                        break
+                    if id(target) in on_stack:
+                        low_link[id(node)] = min(low_link[id(node)], index_of[id(target)])
+                if descended:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[id(parent)] = min(low_link[id(parent)], low_link[id(node)])
+                if low_link[id(node)] == index_of[id(node)]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(id(member))
+                        component.append(member)
+                        if member is node:
+                            break
+                    components.append(component)
+        self.components = components
+        return components
+
+    def _cycle_path(self, component:list) -> list:
+        """Shortest cycle through the first node of a component,as a closed path."""
+        start = component[0]
+        members = {id(node) for node in component}
+        previous:dict[int,object] = {}
+        queue = [start]
+        while queue:
+            node = queue.pop(0)
+            for target in self.edges.get(id(node), []):
+                if id(target) not in members:
+                    continue
+                if target is start:
+                    path = [start, node]
+                    while path[-1] is not start:
+                        path.append(previous[id(path[-1])])
+                    path.reverse()
+                    return path
+                if id(target) not in previous:
+                    previous[id(target)] = node
+                    queue.append(target)
+        return [start, start]
+
+    def get_cycles(self) -> list[list]:
+        cycles = []
+        for component in self.get_components():
+            if len(component) > 1 or component[0] in self.edges.get(id(component[0]), []):
+                cycles.append(self._cycle_path(component))
+        return cycles
+
+    def check_acyclic(self):
+        cycles = self.get_cycles()
+        if cycles:
+            described = "; ".join(" -> ".join(self.get_name(node) for node in cycle) for cycle in cycles)
+            raise ValueError(f"Dependency cycle between {self.kind}: {described}")
+
+    def get_levels(self) -> list[list]:
+        """Topological levels: every node only depends on nodes of lower levels,nodes of one level are independent."""
+        self.check_acyclic()
+        level_of:dict[int,int] = {}
+        levels:list[list] = []
+        for component in self.get_components():
+            node = component[0]
+            level = 1 + max((level_of[id(target)] for target in self.edges.get(id(node), [])), default=-1)
+            level_of[id(node)] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(node)
+        return levels
+
+def build_project_dependency_graph(root_project:ProjectDefinitionBase) -> DependencyGraph:
+    """Projects reachable from root through active project depends and sub-projects."""
+    nodes:list[ProjectDefinitionBase] = []
+    edges:dict[int,list] = {}
+    pending = [root_project]
+    seen = {id(root_project)}
+    while pending:
+        project = pending.pop()
+        nodes.append(project)
+        targets = []
+        for dep in (project.get_public_depends() or []) + (project.get_private_depends() or []):
+            if not _is_generation_active(dep.required_mask):
+                continue
+            dep._init_real()
+            targets.append(dep.project)
+        edges[id(project)] = targets
+        for next_project in targets + [p for p in (project.get_sub_project() or []) if _is_generation_active(p.get_condition_mask())]:
+            if id(next_project) not in seen:
+                seen.add(id(next_project))
+                pending.append(next_project)
+    return DependencyGraph(nodes, edges, lambda p: p.get_name(), "projects")
+
+def build_module_dependency_graph(projects:list[ProjectDefinitionBase]) -> DependencyGraph:
+    """Active modules of the given projects,with their active module depends."""
+    nodes:list[ModuleDefinitionBase] = []
+    edges:dict[int,list] = {}
+    for project in projects:
+        for module in (project.get_public_modules() or []) + (project.get_private_modules() or []):
+            if not _is_generation_active(module.get_condition_mask()):
+                continue
+            nodes.append(module)
+            edges[id(module)] = [dep.module for dep in (module.get_public_depends_modules() or []) + (module.get_private_depends_modules() or [])
+                                 if _is_generation_active(dep.required_mask)]
+    def module_name(module:ModuleDefinitionBase) -> str:
+        owner = project_registry.get_owner(module)
+        return f"{owner.get_name()}::{module.get_name()}" if owner is not None else module.get_name()
+    return DependencyGraph(nodes, edges, module_name, "modules")
+
+def check_dependency_cycles(root_project:ProjectDefinitionBase):
+    """Raises a ValueError naming the full cycle path if projects or modules depend on each other in a cycle."""
+    project_graph = build_project_dependency_graph(root_project)
+    project_graph.check_acyclic()
+    build_module_dependency_graph(project_graph.nodes).check_acyclic()
+
+def generate_project_graph(root_project:ProjectDefinitionBase, max_workers:int = None) -> list[tuple[ProjectDefinitionBase,float,Exception]]:
+    """Generates the build files of every project reachable from root in a thread pool,
+    a project starts once the projects it depends on are generated.
+    Returns (project, seconds, error) in completion order,a failed project does not stop the others."""
+    project_graph = build_project_dependency_graph(root_project)
+    project_graph.check_acyclic()
+    remaining:dict[int,int] = {}
+    dependents:dict[int,list[ProjectDefinitionBase]] = {}
+    for project in project_graph.nodes:
+        targets = {id(target): target for target in project_graph.edges.get(id(project), [])}
+        remaining[id(project)] = len(targets)
+        for target in targets.values():
+            dependents.setdefault(id(target), []).append(project)
+
+    def generate(project:ProjectDefinitionBase) -> tuple[float,Exception]:
+        start = time.perf_counter()
+        try:
+            project.get_makefile_generator().generate_makefile()
+        except Exception as e:
+            return time.perf_counter() - start, e
+        return time.perf_counter() - start, None
+
+    results:list[tuple[ProjectDefinitionBase,float,Exception]] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(generate, project): project for project in project_graph.nodes if remaining[id(project)] == 0}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                project = running.pop(future)
+                elapsed, error = future.result()
+                results.append((project, elapsed, error))
+                for dependent in dependents.get(id(project), []):
+                    remaining[id(dependent)] -= 1
+                    if remaining[id(dependent)] == 0:
+                        running[executor.submit(generate, dependent)] = dependent
+    return results
+
+##############################################################################################################
 
-def load_project(abs_project_dir: Path|str) -> ProjectDefinitionBase:
+graph_cache_version = 3
+graph_cache_file_name = "nbsgp_graph.pickle"
+graph_cache_pointer_file_name = ".nbsgp_cache"
+_graph_cache_saved_counts:tuple[int,int] = None
+
+def _stat_stamp(path:Path|str) -> list[int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+_unpickled_parent_paths:dict[str,Path] = {}
+
+def _unpickle_path(parent:str, name:str) -> Path:
+    # Sibling source files share their parent,so only the file name has to be parsed again
+    parent_path = _unpickled_parent_paths.get(parent)
+    if parent_path is None:
+        parent_path = _unpickled_parent_paths[parent] = Path(parent)
+    return parent_path / name if name else parent_path
+
+def _reduce_path(path:Path):
+    return (_unpickle_path, (str(path.parent), path.name))
+
+# Source paths stamped by the graph cache this run was restored from,kept apart from the definition files
+_cached_source_paths:list[str] = []
+
+def _collect_graph_fingerprint() -> dict[str,list[int]]:
+    """Stamps the tool itself, every loaded definition file and every scanned source path."""
+    fingerprint = {}
+    for path in [Path(__file__).resolve()] + loaded_definition_files + watched_source_paths + _cached_source_paths:
+        path_str = str(path)
+        if path_str not in fingerprint:
+            fingerprint[path_str] = _stat_stamp(path_str)
+    return fingerprint
+
+def _save_graph_cache(root_project:ProjectDefinitionBase, abs_project_path:Path):
+    cache_dir = Path(root_project.get_cache_dir())
+    cache_file = cache_dir / graph_cache_file_name
+    global _graph_cache_saved_counts
+    header = {"version": graph_cache_version, "keys_filter": generation_keys_filter, "fingerprint": _collect_graph_fingerprint(),
+              "definition_files": [str(path) for path in dict.fromkeys(loaded_definition_files)]}
+    graph = {
+        "root": root_project.get_name(),
+        "projects_map": all_projects_map,
+        "projects_Path_map": all_projects_Path_map,
+        "extronal_projects_map": all_extronal_projects_map,
+        "extronal_projects_Path_map": all_extronal_projects_Path_map,
+        "key_bits": key_table.bits,
+    }
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_name(cache_file.name + ".tmp")
+        with open(temp_file, "wb") as f:
+            pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickler.dispatch_table = copyreg.dispatch_table.copy()
+            pickler.dispatch_table[type(Path())] = _reduce_path
+            pickler.dump(header)
+            pickler.dump(graph)
+        os.replace(temp_file, cache_file)
+        with open(abs_project_path / graph_cache_pointer_file_name, "w", encoding='utf-8') as f:
+            f.write(str(cache_file))
+        _graph_cache_saved_counts = (len(loaded_definition_files), len(watched_source_paths))
+    except Exception as e:
+        print(f"Warning: Could not save project graph cache to {cache_file}: {e}")
+
+def _load_graph_cache(abs_project_path:Path) -> ProjectDefinitionBase:
+    """Returns the cached root project if no definition file or watched source path changed, otherwise None."""
+    global _graph_cache_saved_counts
+    pointer_file = abs_project_path / graph_cache_pointer_file_name
+    if not pointer_file.is_file():
+        return None
+    try:
+        cache_file = Path(pointer_file.read_text(encoding='utf-8').strip())
+        with open(cache_file, "rb") as f:
+            unpickler = pickle.Unpickler(f)
+            header = unpickler.load()
+            if header.get("version") != graph_cache_version or header.get("keys_filter") != generation_keys_filter:
+                return None
+            for path_str, stamp in header["fingerprint"].items():
+                if _stat_stamp(path_str) != stamp:
+                    print(f"Project graph cache is outdated,'{path_str}' changed")
+                    return None
+            graph = unpickler.load()
+    except Exception as e:
+        print(f"Warning: Could not read project graph cache for {abs_project_path}: {e}")
+        return None
+    # The cached definitions hold key masks,they are only valid with the key table they were interned in
+    if not key_table.restore(graph["key_bits"]):
+        print(f"Project graph cache is outdated,its key table does not match the keys interned so far")
+        return None
+    all_projects_map.clear()
+    all_projects_map.update(graph["projects_map"])
+    all_projects_Path_map.clear()
+    all_projects_Path_map.update(graph["projects_Path_map"])
+    all_extronal_projects_map.clear()
+    all_extronal_projects_map.update(graph["extronal_projects_map"])
+    all_extronal_projects_Path_map.clear()
+    all_extronal_projects_Path_map.update(graph["extronal_projects_Path_map"])
+    project_registry.reindex()
+    project_reachability.reset()
+    # Keep the stamps,so a later save after lazily resolving more modules still covers what the cache already held
+    loaded_definition_files[:] = [Path(path_str) for path_str in header["definition_files"]]
+    definition_paths = {str(Path(__file__).resolve())} | set(header["definition_files"])
+    _cached_source_paths[:] = [path_str for path_str in header["fingerprint"] if path_str not in definition_paths]
+    watched_source_paths.clear()
+    _graph_cache_saved_counts = (len(loaded_definition_files), len(watched_source_paths))
+    print(f"Loaded project graph of {graph['root']} from cache {cache_file}")
+    return all_projects_map[graph["root"]]
+
+def update_project_graph_cache(root_project:ProjectDefinitionBase):
+    """Saves the graph again if modules were resolved or sources scanned since it was loaded or saved."""
+    if _graph_cache_saved_counts != (len(loaded_definition_files), len(watched_source_paths)):
+        _save_graph_cache(root_project, Path(root_project.RootPath))
+
+_project_load_depth = 0
+
+def _load_project_definition(abs_project_path:Path) -> ProjectDefinitionBase:
+    """Executes a project definition file and registers the project by name,without resolving its dependencies."""
+    project_definition_file = abs_project_path / f"{abs_project_path.name}.py"
+    if not project_definition_file.exists():
+        print(f"Error: Project definition file '{project_definition_file.name}' not found in '{abs_project_path}'.")
+        return None
+    project_def:ProjectDefinitionBase = _load_definition(project_definition_file, 'Project', 'project')
+    project_def.RootPath = abs_project_path
+    print(f"Loading project: {project_def.get_name()}")
+    project_name = project_def.get_name()
+    project_registry.register_project(project_def)
+    return project_def
+
+def load_project(abs_project_dir: Path|str, use_cache:bool = True) -> ProjectDefinitionBase:
     global all_projects_map
     global all_projects_Path_map
+    global _project_load_depth
     abs_project_path = Path(abs_project_dir)
     project_file_name = abs_project_path.name
     print(f"Start loading project: {project_file_name} form path {abs_project_dir}...")
@@ -1423,32 +3867,218 @@ def load_project(abs_project_dir: Path|str) -> ProjectDefinitionBase:
         project_name = all_projects_Path_map[abs_project_path]
         return all_projects_map[project_name]
 
-    project_definition_file = abs_project_path / f"{project_file_name}.py"
-    if not project_definition_file.exists():
-        print(f"Error: Project definition file '{project_definition_file.name}' not found in '{abs_project_path}'.")
+    if _active_graph_loader is not None:
+        return _active_graph_loader.load(abs_project_path)
+
+    # Only the outermost load owns the graph cache,nested load_project calls come from definition files
+    is_root_load = _project_load_depth == 0
+    if is_root_load and use_cache:
+        cached_project = _load_graph_cache(abs_project_path)
+        if cached_project is not None:
+            return cached_project
+    if is_root_load:
+        loaded_definition_files.clear()
+        watched_source_paths.clear()
+        _cached_source_paths.clear()
+        project_reachability.reset()
+
+    _project_load_depth += 1
+    try:
+        project_def:ProjectDefinitionBase = _load_project_definition(abs_project_path)
+    finally:
+        _project_load_depth -= 1
+    if project_def is None:
         return None
-        
-    project_def:ProjectDefinitionBase = _load_definition(project_definition_file, 'Project', 'project')
-    project_def.RootPath = abs_project_path
-    print(f"Loading project: {project_def.get_name()}")
     project_name = project_def.get_name()
-    if project_name in all_projects_map:
-        old_project_def:ProjectDefinitionBase = all_projects_map[project_name]
-        raise AttributeError(f"Two project have same name,but form diferent path:{old_project_def.get_path()}::{project_def.get_path()}")
-    all_projects_map[project_name] = project_def
     try:
         project_def._init_dependency()
+        if is_root_load:
+            check_dependency_cycles(project_def)
     except Exception as e:
-        del all_projects_map[project_name]
+        project_registry.unregister_project(project_name)
         raise AttributeError(f"An error occurred during project loading: {e}")
     print(f"Loaded project: {project_name}")
     all_projects_Path_map[abs_project_path] = project_name
+    if is_root_load and use_cache:
+        _save_graph_cache(project_def, abs_project_path)
     return project_def
 
-def load_module(abs_module_dir: Path|str) -> ModuleDefinitionBase:
-    abs_module_path = Path(abs_module_dir)
+class ProjectGraphLoader:
+    """Loads a project and every project it references,running independent project definitions in a worker pool.
+    Dependencies are only resolved and checked once the whole graph is registered,so definition files no longer
+    have to load their dependency projects in order."""
+    def __init__(self, search_paths:list[Path|str] = None, max_workers:int = None):
+        self.search_paths:list[Path] = [Path(p) for p in search_paths] if search_paths is not None else []
+        self.max_workers = max_workers
+        self.lock = threading.RLock()
+        self.futures:dict[Path,Future] = {}
+        self.started:set[Path] = set()
+        self.loading_threads:dict[Path,int] = {}
+        self.waiting_for:dict[int,Path] = {}
+        self.loaded_projects:list[tuple[Path,ProjectDefinitionBase]] = []
+        self.executor:ThreadPoolExecutor = None
+
+    def _find_project_path(self, project_name:str) -> Path:
+        for search_path in self.search_paths:
+            candidate = search_path / project_name
+            if (candidate / f"{project_name}.py").is_file():
+                return candidate.resolve()
+        return None
+
+    def _claim(self, abs_project_path:Path) -> tuple[Future,bool]:
+        with self.lock:
+            future = self.futures.get(abs_project_path)
+            if future is not None:
+                return future, False
+            future = Future()
+            self.futures[abs_project_path] = future
+            return future, True
+
+    def _schedule(self, abs_project_path:Path):
+        future, claimed = self._claim(abs_project_path)
+        if claimed:
+            self.executor.submit(self._load_into, abs_project_path, future)
+
+    def _start(self, abs_project_path:Path) -> bool:
+        """Marks a claimed project as loading on this thread,False when another thread already took it."""
+        with self.lock:
+            if abs_project_path in self.started:
+                return False
+            self.started.add(abs_project_path)
+            self.loading_threads[abs_project_path] = threading.get_ident()
+            return True
+
+    def _load_into(self, abs_project_path:Path, future:Future):
+        if not self._start(abs_project_path):
+            return # loaded in place by a thread that needed it before a worker got to it
+        try:
+            project_def = _load_project_definition(abs_project_path)
+            if project_def is not None:
+                with self.lock:
+                    self.loaded_projects.append((abs_project_path, project_def))
+                self._schedule_dependencies(project_def)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        finally:
+            with self.lock:
+                del self.loading_threads[abs_project_path]
+        future.set_result(project_def)
+
+    def _schedule_dependencies(self, project_def:ProjectDefinitionBase):
+        for dep in (project_def.get_public_depends() or []) + (project_def.get_private_depends() or []):
+            if dep.project is not None or getattr(dep, "project_name", None) is None:
+                continue
+            if dep.project_name in all_projects_map:
+                continue
+            dep_path = self._find_project_path(dep.project_name)
+            if dep_path is not None:
+                self._schedule(dep_path)
+
+    def _wait(self, abs_project_path:Path, future:Future):
+        if future.done():
+            return future.result()
+        current_thread = threading.get_ident()
+        with self.lock:
+            # Follow the chain of threads waiting on each other,reaching ourselves means the definitions load each other
+            chain = [abs_project_path]
+            owner = self.loading_threads.get(abs_project_path)
+            while owner is not None:
+                if owner == current_thread:
+                    raise AttributeError(f"Project definitions load each other in a cycle:{' -> '.join(str(p) for p in chain)}")
+                waited_path = self.waiting_for.get(owner)
+                if waited_path is None:
+                    break
+                chain.append(waited_path)
+                owner = self.loading_threads.get(waited_path)
+            self.waiting_for[current_thread] = abs_project_path
+        try:
+            return future.result()
+        finally:
+            with self.lock:
+                del self.waiting_for[current_thread]
+
+    def load(self, abs_project_path:Path) -> ProjectDefinitionBase:
+        """Called by load_project from inside definition files while the graph is loading."""
+        abs_project_path = abs_project_path.resolve()
+        future, _ = self._claim(abs_project_path)
+        # A project still queued is loaded right here,blocking on it could take the last free worker
+        self._load_into(abs_project_path, future)
+        return self._wait(abs_project_path, future)
+
+    def _forget_loaded_projects(self):
+        for _, project_def in self.loaded_projects:
+            project_registry.unregister_project(project_def.get_name())
+
+    def run(self, abs_project_path:Path) -> ProjectDefinitionBase:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self.executor = executor
+            self._schedule(abs_project_path)
+            while True:
+                with self.lock:
+                    pending = [f for f in self.futures.values() if not f.done()]
+                if not pending:
+                    break
+                wait(pending)
+        self.executor = None
+        for future in self.futures.values():
+            if future.exception() is not None:
+                self._forget_loaded_projects()
+                raise future.exception()
+        root_project = self.futures[abs_project_path].result()
+        if root_project is None:
+            self._forget_loaded_projects()
+            return None
+
+        for project_path, project_def in self.loaded_projects:
+            try:
+                project_def._init_dependency()
+            except Exception as e:
+                self._forget_loaded_projects()
+                raise AttributeError(f"An error occurred during project loading of {project_def.get_name()}: {e}")
+        try:
+            check_dependency_cycles(root_project)
+        except ValueError:
+            self._forget_loaded_projects()
+            raise
+        for project_path, project_def in self.loaded_projects:
+            all_projects_Path_map[project_path] = project_def.get_name()
+            print(f"Loaded project: {project_def.get_name()}")
+        return root_project
+
+_active_graph_loader:ProjectGraphLoader = None
+
+def load_project_graph(abs_project_dir: Path|str, search_paths:list[Path|str] = None, max_workers:int = None, use_cache:bool = True) -> ProjectDefinitionBase:
+    """Loads the root project and its whole transitive project graph in parallel.
+    Projects referenced only by name in a ProjectDependency are searched as '<search_path>/<name>/<name>.py',
+    the search paths default to the directory containing the root project."""
+    global _active_graph_loader
+    abs_project_path = Path(abs_project_dir).resolve()
+    print(f"Start loading project graph form path {abs_project_path}...")
+    if abs_project_path in all_projects_Path_map:
+        return all_projects_map[all_projects_Path_map[abs_project_path]]
+    if use_cache:
+        cached_project = _load_graph_cache(abs_project_path)
+        if cached_project is not None:
+            return cached_project
+    loaded_definition_files.clear()
+    watched_source_paths.clear()
+    _cached_source_paths.clear()
+    project_reachability.reset()
+
+    loader = ProjectGraphLoader(search_paths if search_paths is not None else [abs_project_path.parent], max_workers)
+    _active_graph_loader = loader
+    try:
+        project_def = loader.run(abs_project_path)
+    finally:
+        _active_graph_loader = None
+    if project_def is not None and use_cache:
+        _save_graph_cache(project_def, abs_project_path)
+    return project_def
+
+def _load_module_definition(abs_module_path: Path) -> ModuleDefinitionBase:
     module_name = abs_module_path.name
-    print(f"Start loading module: {module_name} form path {abs_module_dir}...")
+    print(f"Start loading module: {module_name} form path {abs_module_path}...")
     module_definition_file = abs_module_path / f"{module_name}.py"
     if not module_definition_file.exists():
         raise AttributeError(f"Error: Module definition file '{module_definition_file.name}' not found in '{abs_module_path}'.")
@@ -1459,6 +4089,169 @@ def load_module(abs_module_dir: Path|str) -> ModuleDefinitionBase:
         
     return module_def
 
+_lazy_module_lock = threading.RLock()
+
+def _resolve_provisional_modules(modules:list[ModuleDefinitionBase]) -> bool:
+    """Runs the definitions of lazy modules still known by their directory name only,True when there were any."""
+    provisional = [module for module in modules if isinstance(module, LazyModuleDefinition) and module.module is None]
+    for module in provisional:
+        module._resolve()
+    return len(provisional) > 0
+
+class LazyModuleDefinition(ModuleDefinitionBase):
+    """Stands in for a module definition file until the generator,the validator or a dependency lookup needs it.
+    Until then the module is known by its directory name and,when given to load_module,by its condition keys.
+    The directory name is provisional,a definition naming the module otherwise renames it once it ran."""
+    def __init__(self, path: Path, condition_keys:list[str] = None):
+        ModuleDefinitionBase.__init__(self, path.name, path)
+        self.condition_keys = condition_keys
+        self.condition_mask = key_table.get_mask(condition_keys) if condition_keys is not None else None
+        self.owner_project:ProjectDefinitionBase = None
+        self.module:ModuleDefinitionBase = None
+
+    def _resolve(self) -> ModuleDefinitionBase:
+        if self.module is None:
+            with _lazy_module_lock:
+                if self.module is None:
+                    module_def = _load_module_definition(self.path)
+                    if self.condition_keys is not None and module_def.get_condition_keys() != self.condition_keys:
+                        raise AttributeError(f"The module '{module_def.get_name()}' declares condition keys {module_def.get_condition_keys()},but was loaded with condition keys {self.condition_keys}")
+                    if self.owner_project is not None:
+                        module_def._set_owner(self.owner_project)
+                    self.module = module_def
+                    if module_def.get_name() != self.name:
+                        old_name = self.name
+                        self.name = module_def.get_name()
+                        if self.owner_project is not None:
+                            project_registry.rename_module(self.owner_project.get_name(), self, old_name)
+        return self.module
+
+    def _to_abs_path(self,path:Path|str)->Path:
+        return self._resolve()._to_abs_path(path)
+
+    def _init_real_paths(self):
+        return self._resolve()._init_real_paths()
+
+    def _set_owner(self,owner):
+        self.owner_project = owner
+        if self.module is not None:
+            self.module._set_owner(owner)
+
+    def _init_dependency(self):
+        return self._resolve()._init_dependency()
+
+    def _check_dependency_legitimacy(self):
+        return self._resolve()._check_dependency_legitimacy()
+
+    def get_name(self)->str:
+        return self.name
+
+    def get_path(self)->Path:
+        return self._resolve().get_path()
+
+    def get_condition_keys(self) -> list[str]:
+        if self.condition_keys is not None:
+            return self.condition_keys
+        return self._resolve().get_condition_keys()
+
+    def get_condition_mask(self) -> int:
+        if self.condition_mask is not None:
+            return self.condition_mask
+        return self._resolve().get_condition_mask()
+
+    def get_library_type(self)->str:
+        return self._resolve().get_library_type()
+
+    def get_public_source_files(self) -> list[Path|str]:
+        return self._resolve().get_public_source_files()
+
+    def get_private_source_files(self) -> list[Path|str]:
+        return self._resolve().get_private_source_files()
+
+    def get_public_include_files(self) -> list[Path|str]:
+        return self._resolve().get_public_include_files()
+
+    def get_private_include_files(self) -> list[Path|str]:
+        return self._resolve().get_private_include_files()
+
+    def get_public_macros(self) -> list[str]:
+        return self._resolve().get_public_macros()
+
+    def get_private_macros(self) -> list[str]:
+        return self._resolve().get_private_macros()
+
+    def get_public_depends_modules(self):
+        return self._resolve().get_public_depends_modules()
+
+    def get_private_depends_modules(self):
+        return self._resolve().get_private_depends_modules()
+
+    def get_public_external_depends(self)->list[ExternalModuleDependencyBase]:
+        return self._resolve().get_public_external_depends()
+
+    def get_private_external_depends(self)->list[ExternalModuleDependencyBase]:
+        return self._resolve().get_private_external_depends()
+
+    def get_owner_project(self):
+        return self.owner_project
+
+    def get_source_extensions(self) -> list[str]:
+        return self._resolve().get_source_extensions()
+
+    def get_exclude(self) -> list[str]:
+        return self._resolve().get_exclude()
+
+    def get_public_source_entries(self) -> list[Path]:
+        return self._resolve().get_public_source_entries()
+
+    def get_private_source_entries(self) -> list[Path]:
+        return self._resolve().get_private_source_entries()
+
+    def get_source_entries(self) -> list[Path]:
+        return self._resolve().get_source_entries()
+
+    def get_glob_sources(self) -> bool:
+        return self._resolve().get_glob_sources()
+
+    def get_unity_build(self) -> bool:
+        return self._resolve().get_unity_build()
+
+    def get_unity_batch_size(self) -> int:
+        return self._resolve().get_unity_batch_size()
+
+    def get_unity_exclude(self) -> list[str]:
+        return self._resolve().get_unity_exclude()
+
+    def get_public_pch(self) -> list[Path|str]:
+        return self._resolve().get_public_pch()
+
+    def get_private_pch(self) -> list[Path|str]:
+        return self._resolve().get_private_pch()
+
+    def get_pch_reuse_from(self) -> ModuleDependencyBase:
+        return self._resolve().get_pch_reuse_from()
+
+    def get_source_filter(self) -> SourceFilter:
+        return self._resolve().get_source_filter()
+
+    def get_definition_file(self) -> Path:
+        return self.path / f"{self.path.name}.py"
+
+    def reload(self) -> ModuleDefinitionBase:
+        """Runs the module definition file again,used by watch mode after the file was edited."""
+        with _lazy_module_lock:
+            self.module = None
+        return self._resolve()
+
+def load_module(abs_module_dir: Path|str, condition_keys:list[str] = None) -> ModuleDefinitionBase:
+    """Returns a lazy module,its definition file only runs once the module is needed.
+    Passing the module's condition_keys lets key filtered generation skip inactive modules without running them."""
+    abs_module_path = Path(os.path.abspath(abs_module_dir))
+    module_definition_file = abs_module_path / f"{abs_module_path.name}.py"
+    if not module_definition_file.exists():
+        raise AttributeError(f"Error: Module definition file '{module_definition_file.name}' not found in '{abs_module_path}'.")
+    return LazyModuleDefinition(abs_module_path, condition_keys)
+
 ##############################################################################################################
 
 class ExternalModuleDependency(ExternalModuleDependencyBase):
@@ -1467,14 +4260,12 @@ class ExternalModuleDependency(ExternalModuleDependencyBase):
         self.project_name = project_name
         self.module_name = module_name
     def _init_real(self):
-        global all_extronal_projects_map
         if self.module is None:
             if self.project_name is None or self.module_name is None:
                 raise AttributeError(f"The program declares a module dependency, but does not specify a dependency project_name or module_name")
-            project:ExternalProjectDefinitionBase = all_extronal_projects_map.get(self.project_name)
-            if project is None:
+            if project_registry.find_external_project(self.project_name) is None:
                 raise AttributeError(f"The program declares a module dependency:{self.project_name}::{self.module_name},but no project named {self.project_name} was found")
-            module = project.from_name_get_module(self.module_name)
+            module = project_registry.find_external_module(self.project_name, self.module_name)
             if module is None:
                 raise AttributeError(f"The program declares a module dependency,but the project named {self.project_name} does not have a module named {self.module_name}")
             self.module = module
@@ -1504,10 +4295,9 @@ class ModuleDependency(ModuleDependencyBase):
         if self.module is None:
             if self.project_name is None or self.module_name is None:
                 raise AttributeError(f"The program declares a dependency, but does not specify a dependency item or module")
-            project:ProjectDefinitionBase = all_projects_map.get(self.project_name)
-            if project is None:
+            if project_registry.find_project(self.project_name) is None:
                 raise AttributeError(f"The program declares a module dependency: {self.project_name}::{self.module_name} ,but no project named {self.project_name} was found")
-            module = project.from_name_get_module(self.module_name)
+            module = project_registry.find_module(self.project_name, self.module_name)
             if module is None:
                 raise AttributeError(f"The program declares a module dependency,but the project named {self.project_name} does not have a module named {self.module_name}")
             self.module = module
@@ -1529,9 +4319,319 @@ class ProjectDependency(ProjectDependencyBase):
 
 ##############################################################################################################
 
+##############################################################################################################
+# --- Watch Mode ---
+
+class _InotifyWatcher:
+    """Linux inotify through ctypes. Reports directories whose entries were added,removed or renamed,
+    and files that were written or replaced."""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_IGNORED = 0x00008000
+    IN_CLOEXEC = 0o2000000
+    watch_mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    event_header = struct.Struct("iIII")
+
+    def __init__(self, ignored_names:set[str] = None):
+        self.ignored_names = ignored_names if ignored_names is not None else set()
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wd_paths:dict[int,str] = {}
+        self.path_wds:dict[str,int] = {}
+
+    def add_dir(self, dir_path:str):
+        if dir_path in self.path_wds:
+            return
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), self.watch_mask)
+        if wd < 0:
+            print(f"Warning: Could not watch {dir_path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self.wd_paths[wd] = dir_path
+        self.path_wds[dir_path] = wd
+
+    def add_file(self, file_path:str):
+        self.add_dir(os.path.dirname(file_path))
+
+    def wait(self, timeout:float) -> tuple[set[str],set[str]]:
+        """Returns (changed directories, written files),both empty when nothing happened within timeout."""
+        changed_dirs:set[str] = set()
+        written_files:set[str] = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed_dirs, written_files
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, name_length = self.event_header.unpack_from(data, offset)
+            offset += self.event_header.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            dir_path = self.wd_paths.get(wd)
+            if dir_path is None:
+                continue
+            if mask & self.IN_IGNORED:
+                del self.wd_paths[wd]
+                self.path_wds.pop(dir_path, None)
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                changed_dirs.add(os.path.dirname(dir_path))
+                continue
+            if name in self.ignored_names:
+                continue
+            if mask & (self.IN_CREATE | self.IN_DELETE | self.IN_MOVED_FROM | self.IN_MOVED_TO):
+                changed_dirs.add(dir_path)
+            if mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE):
+                written_files.add(os.path.join(dir_path, name))
+        return changed_dirs, written_files
+
+    def close(self):
+        os.close(self.fd)
+
+class _PollingWatcher:
+    """Portable fallback,compares directory mtimes and file stamps every poll_interval seconds."""
+    def __init__(self, poll_interval:float = 1.0):
+        self.poll_interval = poll_interval
+        self.dir_stamps:dict[str,int] = {}
+        self.file_stamps:dict[str,list[int]] = {}
+
+    def add_dir(self, dir_path:str):
+        if dir_path not in self.dir_stamps:
+            try:
+                self.dir_stamps[dir_path] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                return
+
+    def add_file(self, file_path:str):
+        if file_path not in self.file_stamps:
+            self.file_stamps[file_path] = _stat_stamp(file_path)
+
+    def wait(self, timeout:float) -> tuple[set[str],set[str]]:
+        time.sleep(min(timeout, self.poll_interval))
+        changed_dirs:set[str] = set()
+        written_files:set[str] = set()
+        for dir_path, mtime in list(self.dir_stamps.items()):
+            try:
+                new_mtime = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                del self.dir_stamps[dir_path]
+                changed_dirs.add(os.path.dirname(dir_path))
+                continue
+            if new_mtime != mtime:
+                self.dir_stamps[dir_path] = new_mtime
+                changed_dirs.add(dir_path)
+        for file_path, stamp in self.file_stamps.items():
+            new_stamp = _stat_stamp(file_path)
+            if new_stamp != stamp:
+                self.file_stamps[file_path] = new_stamp
+                written_files.add(file_path)
+        return changed_dirs, written_files
+
+    def close(self):
+        return
+
+class ProjectGraphWatcher:
+    """Keeps the loaded project graph in memory and regenerates only what a change affects.
+    A file added or removed in a source directory re-evaluates the modules reading that directory and rewrites
+    their project's CMakeLists.txt,an edited module definition reloads that module only,
+    any other definition edit reloads the whole graph."""
+    # Files written by generation itself,the inotify backend drops their events
+    generated_file_names = {"CMakeLists.txt", "CMakePresets.json", "CMakeLists.txt.tmp", "CMakePresets.json.tmp", graph_cache_pointer_file_name}
+
+    def __init__(self, root_project:ProjectDefinitionBase, search_paths:list[Path|str] = None, max_workers:int = None,
+                 use_cache:bool = True, use_inotify:bool = True, poll_interval:float = 1.0, settle_time:float = 0.2):
+        self.root_project = root_project
+        self.root_path = Path(root_project.RootPath)
+        self.search_paths = search_paths
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.settle_time = settle_time
+        self.backend = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.backend = _InotifyWatcher(self.generated_file_names)
+            except (OSError, AttributeError) as e:
+                print(f"Warning: inotify is not available,falling back to polling: {e}")
+        if self.backend is None:
+            self.backend = _PollingWatcher(poll_interval)
+        self.module_roots:dict[ModuleDefinitionBase,list[tuple[str,bool]]] = {}
+        self.module_files:dict[str,LazyModuleDefinition] = {}
+        self.definition_files:set[str] = set()
+        self._collect_targets()
+
+    def get_projects(self) -> list[ProjectDefinitionBase]:
+        """Projects whose CMakeLists.txt watch mode keeps up to date,the ones 'build' generates."""
+        return [self.root_project]
+
+    def _active_modules(self, project:ProjectDefinitionBase) -> list[ModuleDefinitionBase]:
+        return [m for m in (project.get_public_modules() or []) + (project.get_private_modules() or [])
+                if _is_generation_active(m.get_condition_mask())]
+
+    @staticmethod
+    def _entry_roots(module:ModuleDefinitionBase) -> list[tuple[str,bool]]:
+        """(directory, recursive) pairs whose listing decides the module's source files."""
+        roots = []
+        glob_sources = module.get_glob_sources()
+        for entry in module.get_source_entries() or []:
+            if glob_sources and _cmake_source_glob(entry) is not None:
+                # CMake itself picks up files added under this entry
+                continue
+            entry_str = os.path.normpath(str(entry))
+            if any(c in entry_str for c in '*?['):
+                base_parts = []
+                for part in entry_str.split(os.sep):
+                    if any(c in part for c in '*?['):
+                        break
+                    base_parts.append(part)
+                roots.append((os.sep.join(base_parts) or os.sep, True))
+            elif os.path.isdir(entry_str):
+                roots.append((entry_str, True))
+            else:
+                roots.append((os.path.dirname(entry_str), False))
+        return roots
+
+    def _watch_module(self, module:ModuleDefinitionBase):
+        roots = self._entry_roots(module)
+        self.module_roots[module] = roots
+        for root_dir, recursive in roots:
+            if not recursive:
+                self.backend.add_dir(root_dir)
+                continue
+            for dir_path, dirs, files in os.walk(root_dir):
+                self.backend.add_dir(os.path.normpath(dir_path))
+
+    def _collect_targets(self):
+        self.module_roots.clear()
+        self.module_files.clear()
+        self.definition_files = {os.path.normpath(str(f)) for f in loaded_definition_files}
+        for project in self.get_projects():
+            for module in self._active_modules(project):
+                try:
+                    self._watch_module(module)
+                except Exception as e:
+                    print(f"Warning: Could not watch module {module.get_name()}: {e}")
+                if isinstance(module, LazyModuleDefinition):
+                    module_file = os.path.normpath(str(module.get_definition_file()))
+                    self.module_files[module_file] = module
+                    self.definition_files.add(module_file)
+        for definition_file in self.definition_files:
+            self.backend.add_file(definition_file)
+
+    def _is_ignored(self, dir_path:str) -> bool:
+        # Generation writes into the cache and build directories,their changes must not trigger another generation
+        for project in self.get_projects():
+            for output_dir in (project.get_cache_dir(), project.get_path() / "build"):
+                if output_dir is None:
+                    continue
+                output_str = os.path.normpath(str(output_dir))
+                if dir_path == output_str or dir_path.startswith(output_str + os.sep):
+                    return True
+        return False
+
+    def _modules_reading(self, changed_dirs:set[str]) -> dict[ProjectDefinitionBase,list[ModuleDefinitionBase]]:
+        affected:dict[ProjectDefinitionBase,list[ModuleDefinitionBase]] = {}
+        for module, roots in self.module_roots.items():
+            for root_dir, recursive in roots:
+                if any(d == root_dir or (recursive and d.startswith(root_dir.rstrip(os.sep) + os.sep)) for d in changed_dirs):
+                    affected.setdefault(module.get_owner_project(), []).append(module)
+                    break
+        return affected
+
+    def _on_sources_changed(self, changed_dirs:set[str]):
+        affected = self._modules_reading(changed_dirs)
+        for project, modules in affected.items():
+            snapshot = project.source_snapshot if isinstance(project, ProjectDefinition) else None
+            if snapshot is not None:
+                for dir_path in changed_dirs:
+                    snapshot.refresh(dir_path)
+            for module in modules:
+                print(f"Sources of module {module.get_name()} changed,re-evaluating")
+                try:
+                    module._init_real_paths()
+                    self._watch_module(module)
+                except Exception as e:
+                    print(f"Warning: Could not re-evaluate module {module.get_name()}: {e}")
+            project.get_makefile_generator().generate_cmakelists()
+
+    def _on_module_definition_changed(self, module:LazyModuleDefinition):
+        print(f"Definition of module {module.get_name()} changed,reloading it")
+        module.reload()
+        module._init_dependency()
+        module._check_dependency_legitimacy()
+        self._watch_module(module)
+        module.get_owner_project().get_makefile_generator().generate_cmakelists()
+
+    def _reload_graph(self):
+        print("A project definition changed,reloading the project graph")
+        project_registry.clear()
+        self.root_project = load_project_graph(self.root_path, self.search_paths, self.max_workers, use_cache=False)
+        for project in self.get_projects():
+            project.get_makefile_generator().generate_makefile()
+        self._collect_targets()
+
+    def _handle(self, changed_dirs:set[str], written_files:set[str]):
+        written_definitions = {f for f in written_files if f in self.definition_files}
+        changed_dirs = {d for d in changed_dirs if not self._is_ignored(d)}
+        try:
+            if any(f not in self.module_files for f in written_definitions):
+                self._reload_graph()
+            else:
+                for definition_file in written_definitions:
+                    self._on_module_definition_changed(self.module_files[definition_file])
+                if changed_dirs:
+                    self._on_sources_changed(changed_dirs)
+        except Exception as e:
+            print(f"Warning: Regeneration failed,waiting for the next change: {e}")
+            return
+        save_source_indexes()
+        save_artifact_stores()
+        if self.use_cache:
+            update_project_graph_cache(self.root_project)
+        # Re-evaluation keeps appending the same directories,keep the fingerprint list from growing without bound
+        watched_source_paths[:] = list(dict.fromkeys(watched_source_paths))
+
+    def run(self):
+        print(f"Watching project {self.root_project.get_name()} with {type(self.backend).__name__},press Ctrl+C to stop")
+        try:
+            while True:
+                changed_dirs, written_files = self.backend.wait(3600)
+                if not changed_dirs and not written_files:
+                    continue
+                # Let a burst of events (an editor save,a checkout) settle into one regeneration
+                while True:
+                    more_dirs, more_files = self.backend.wait(self.settle_time)
+                    if not more_dirs and not more_files:
+                        break
+                    changed_dirs |= more_dirs
+                    written_files |= more_files
+                self._handle(changed_dirs, written_files)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            self.backend.close()
+
+def _split_command_options(args:list[str]) -> tuple[list[str],dict[str,str|bool]]:
+    """Splits '--name' / '--name=value' options from positional command arguments."""
+    positional:list[str] = []
+    options:dict[str,str|bool] = {}
+    for arg in args:
+        if arg.startswith("--"):
+            option_name, has_value, option_value = arg[2:].partition("=")
+            options[option_name] = option_value if has_value else True
+        else:
+            positional.append(arg)
+    return positional, options
+
 def main_func(argv:list[str]):
+    global generation_keys_filter, generation_keys_mask
     if len(argv) < 2:
-        print("Usage: python nbsgp.py <absolute_project_path> [command]")
+        print("Usage: python nbsgp.py <absolute_project_path> [command] [--options]")
         print("Example: python nbsgp.py /Users/youruser/Projects/MyGameProject clean")
         raise ValueError(f"Fatel Command Error")
     
@@ -1541,15 +4641,29 @@ def main_func(argv:list[str]):
         print(f"Error: Project directory not found at {root_project_path}")
         raise ValueError(f"Fatel Command Error")
     
+    positional_args, options = _split_command_options(argv[2:])
+    use_cache = not options.get("no-cache", False)
+    if isinstance(options.get("keys"), str):
+        generation_keys_filter = [key for key in options["keys"].replace(",", ";").split(";") if key]
+        generation_keys_mask = key_table.get_mask(generation_keys_filter)
+    
     target_projects:list[ProjectDefinitionBase] = []
     
     try:
-        target_projects.append(load_project(root_project_path))
+        search_paths = options["search-path"].split(os.pathsep) if isinstance(options.get("search-path"), str) else None
+        max_workers = int(options["jobs"]) if isinstance(options.get("jobs"), str) else None
+        generation_load_options[:] = ["--no-cache"] if not use_cache else []
+        if search_paths is not None:
+            # The regenerate rule runs in the build directory,relative search paths would point elsewhere
+            generation_load_options.append(f"--search-path={os.pathsep.join(str(Path(p).resolve()) for p in search_paths)}")
+        if max_workers is not None:
+            generation_load_options.append(f"--jobs={max_workers}")
+        target_projects.append(load_project_graph(root_project_path, search_paths, max_workers, use_cache = use_cache))
     except Exception as e:
         print(f"Append project failed:{e}")
         return
     
-    command = argv[2] if len(argv) > 2 else "build"
+    command = positional_args[0] if len(positional_args) > 0 else "build"
 
     unknow_command = True
     
@@ -1563,7 +4677,40 @@ def main_func(argv:list[str]):
             except Exception as e:
                 print(f"Warning: Could not execute cleaning for project named as {i.get_name()} : {e}")
         print("clean all build and package directories complete")
-    if command == "build":
+    if command == "build" and options.get("generator") in graph_generators:
+        unknow_command = False
+        print(f"Building {options['generator']} makefile...")
+        try:
+            graph_generators[options["generator"]](target_projects[0]).generate_makefile()
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        save_source_indexes()
+        save_artifact_stores()
+        if use_cache:
+            update_project_graph_cache(target_projects[0])
+        print(f"Build {options['generator']} makefile complete")
+    elif command == "build" and options.get("all", False):
+        unknow_command = False
+        print("Building makefiles of every project in the graph...")
+        start = time.perf_counter()
+        try:
+            results = generate_project_graph(target_projects[0], max_workers)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        elapsed_total = time.perf_counter() - start
+        print("Generation summary:")
+        for project, elapsed, error in sorted(results, key=lambda result: result[1], reverse=True):
+            status = f"failed: {error}" if error is not None else "ok"
+            print(f"  {project.get_name():<32} {elapsed * 1000:9.1f} ms  {status}")
+        failed = sum(1 for result in results if result[2] is not None)
+        print(f"Generated {len(results) - failed} of {len(results)} projects in {elapsed_total * 1000:.1f} ms")
+        save_source_indexes()
+        save_artifact_stores()
+        if use_cache:
+            update_project_graph_cache(target_projects[0])
+    elif command == "build":
         unknow_command = False
         print("Building all porjects makefile...")
         for i in target_projects:
@@ -1572,14 +4719,68 @@ def main_func(argv:list[str]):
                 i.get_makefile_generator().generate_makefile()
             except Exception as e:
                 print(f"Warning: Could not execute building for project named as {i.get_name()} : {e}")
+        save_source_indexes()
+        save_artifact_stores()
+        if use_cache:
+            update_project_graph_cache(target_projects[0])
         print("Build all porjects makefiles complete")
+    if command == "watch":
+        unknow_command = False
+        print("Building all porjects makefile before watching...")
+        for i in target_projects:
+            try:
+                i.get_makefile_generator().generate_makefile()
+            except Exception as e:
+                print(f"Warning: Could not execute building for project named as {i.get_name()} : {e}")
+        save_source_indexes()
+        save_artifact_stores()
+        if use_cache:
+            update_project_graph_cache(target_projects[0])
+        poll_interval = float(options["poll-interval"]) if isinstance(options.get("poll-interval"), str) else 1.0
+        watcher = ProjectGraphWatcher(target_projects[0], search_paths, max_workers, use_cache = use_cache,
+                                      use_inotify = not options.get("poll", False), poll_interval = poll_interval)
+        watcher.run()
+    if command == "train":
+        unknow_command = False
+        mode_names = [name for name in options["mode"].replace(",", ";").split(";") if name] if isinstance(options.get("mode"), str) else None
+        try:
+            if train_pgo_profiles(target_projects[0], mode_names, reset = options.get("reset", False)):
+                print("Training complete")
+        except ValueError as e:
+            print(f"Error: {e}")
+    if command == "order":
+        unknow_command = False
+        project_graph = build_project_dependency_graph(target_projects[0])
+        try:
+            print("Project generation order,projects of one level are independent:")
+            for level, projects in enumerate(project_graph.get_levels()):
+                print(f"Level {level}: {', '.join(p.get_name() for p in projects)}")
+            if options.get("modules", False):
+                module_graph = build_module_dependency_graph(project_graph.nodes)
+                print("Module build order:")
+                for level, modules in enumerate(module_graph.get_levels()):
+                    print(f"Level {level}: {', '.join(module_graph.get_name(m) for m in modules)}")
+        except ValueError as e:
+            print(f"Error: {e}")
     if command == "help":
         unknow_command = False
-        print("Usage: python nbsgp.py <absolute_project_path> [command]")
+        print("Usage: python nbsgp.py <absolute_project_path> [command] [--options]")
         print("Example: python nbsgp.py /Users/youruser/Projects/MyGameProject clean")
         print("Commands:")
-        print("[build]:Build Target Projects makefile")
+        print("[build]:Build Target Projects makefile,add --all to build every project of the graph in parallel")
         print("[clean]:clean Target Projects makefile")
+        print("[train]:Run the pgo_train commands of the built instrumented (pgo generate) modes and merge their profiles,--mode=<name> picks modes,--reset drops old profiles")
+        print("[order]:Print the topological levels of the project graph,add --modules for the module graph")
+        print("[watch]:Build Target Projects makefile,then keep regenerating the CMakeLists.txt affected by source or definition changes")
+        print("Options:")
+        print("[--no-cache]:Ignore the cached project graph and reload every definition file")
+        print(f"[--search-path=<dir>{os.pathsep}<dir>]:Where projects referenced only by name are searched,default is the root project's parent directory")
+        print("[--jobs=<n>]:Number of worker threads used to load projects,and to generate them with build --all")
+        print("[--keys=<key>;<key>]:Only load,check and generate modules and dependencies active for these condition keys")
+        print("[--generator=superbuild]:build one superbuild root in the cache dir that add_subdirectory()s every project of the graph,no install or find_package between them")
+        print("[--generator=ninja]:build build/ninja-<mode>/build.ninja for every build mode directly,no CMake configure step")
+        print("[--poll]:watch by polling instead of inotify")
+        print("[--poll-interval=<seconds>]:How often watch polls for changes,default is 1 second")
     if unknow_command is True:
         print(f"{command} is a unknow command,use help to find help")
     return
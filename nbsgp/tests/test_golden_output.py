@@ -0,0 +1,130 @@
+"""Golden-file tests of the CMakeLists.txt and CMakePresets.json generated for the sample projects in testfiles.
+The output has to be byte-identical between runs and whatever order the file system lists directories in."""
+import glob
+import importlib.util
+import os
+import random
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+NBSGP_DIR = Path(__file__).resolve().parent.parent / "nbsgp"
+TESTFILES_DIR = Path(__file__).resolve().parent.parent / "testfiles"
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+PROJECTS = ["MyEngineProject", "MyGameProject"]
+GENERATED_FILES = ["CMakeLists.txt", "CMakePresets.json"]
+
+
+def _make_sandbox(root:Path) -> Path:
+    """Copies the sample projects without their generated files,with the Windows only paths of the definitions made portable."""
+    sandbox = root / "testfiles"
+    shutil.copytree(TESTFILES_DIR, sandbox)
+    for project in PROJECTS:
+        for name in GENERATED_FILES:
+            (sandbox / project / name).unlink(missing_ok = True)
+        definition = sandbox / project / f"{project}.py"
+        text = definition.read_text(encoding = "latin-1")
+        text = text.replace('r"I:\\PythonProject\\nbsgp\\testfiles\\MyEngineProject"', 'project_root.parent / "MyEngineProject"')
+        text = text.replace('"source\\', '"source/')
+        definition.write_text(text, encoding = "latin-1")
+    return sandbox
+
+
+def _add_sources(sandbox:Path):
+    """More source files per directory than the samples have,so the listing order has something to reorder."""
+    private_dir = sandbox / "MyEngineProject" / "source" / "EngineCore" / "private"
+    for sub_dir in ["", "detail", "detail/platform"]:
+        (private_dir / sub_dir).mkdir(parents = True, exist_ok = True)
+        for index in range(6):
+            name = f"{sub_dir.replace('/', '_')}_part{index}" if sub_dir else f"part{index}"
+            (private_dir / sub_dir / f"{name}.cpp").write_text(f"int {name}() {{ return {index}; }}\n")
+
+
+def _generate(sandbox:Path, monkeypatch) -> dict[str,bytes]:
+    """Generates every sample project with a freshly imported nbsgp,so no project registered by an earlier run is reused."""
+    monkeypatch.syspath_prepend(str(NBSGP_DIR))
+    outputs = {}
+    for project in PROJECTS:
+        monkeypatch.delitem(sys.modules, "nbsgp_interface", raising = False)
+        spec = importlib.util.spec_from_file_location("nbsgp", NBSGP_DIR / "nbsgp.py")
+        nbsgp = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, "nbsgp", nbsgp)
+        spec.loader.exec_module(nbsgp)
+        nbsgp.main_func(["nbsgp.py", str(sandbox / project), "build", "--no-cache"])
+        for name in GENERATED_FILES:
+            outputs[f"{project}/{name}"] = (sandbox / project / name).read_bytes()
+    return outputs
+
+
+class _ShuffledScandir:
+    """os.scandir iterator handing out the entries in a shuffled order."""
+    def __init__(self, entries:list):
+        self.entries = iter(entries)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+
+def _shuffle_listing(monkeypatch, seed:int) -> list[int]:
+    """Makes os.scandir,os.listdir and glob.glob (and so os.walk) list in a shuffled order,returns the call counter."""
+    rng = random.Random(seed)
+    calls = [0]
+    scandir, listdir, glob_glob = os.scandir, os.listdir, glob.glob
+
+    def shuffled(items:list) -> list:
+        calls[0] += 1
+        rng.shuffle(items)
+        return items
+
+    def shuffled_scandir(path = "."):
+        with scandir(path) as it:
+            return _ShuffledScandir(shuffled(list(it)))
+
+    monkeypatch.setattr(os, "scandir", shuffled_scandir)
+    monkeypatch.setattr(os, "listdir", lambda path = ".": shuffled(listdir(path)))
+    monkeypatch.setattr(glob, "glob", lambda *args, **kwargs: shuffled(glob_glob(*args, **kwargs)))
+    return calls
+
+
+def _normalize(content:bytes) -> str:
+    """Generated files use the platform's line endings,the golden files are stored with '\\n'."""
+    return content.decode("utf-8").replace(os.linesep, "\n")
+
+
+def test_output_matches_golden_files(tmp_path, monkeypatch):
+    outputs = _generate(_make_sandbox(tmp_path), monkeypatch)
+    for name, content in outputs.items():
+        assert _normalize(content) == (GOLDEN_DIR / name).read_text(encoding = "utf-8"), f"{name} differs from its golden file"
+
+
+def test_output_is_identical_across_runs(tmp_path, monkeypatch):
+    first = _generate(_make_sandbox(tmp_path / "first"), monkeypatch)
+    second = _generate(_make_sandbox(tmp_path / "second"), monkeypatch)
+    assert first == second
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_output_is_identical_with_shuffled_directory_order(tmp_path, monkeypatch, seed):
+    ordered_sandbox = _make_sandbox(tmp_path / "ordered")
+    _add_sources(ordered_sandbox)
+    expected = _generate(ordered_sandbox, monkeypatch)
+    sandbox = _make_sandbox(tmp_path / "shuffled")
+    _add_sources(sandbox)
+    calls = _shuffle_listing(monkeypatch, seed)
+    shuffled = _generate(sandbox, monkeypatch)
+    assert calls[0] > 0, "the generation did not list any directory"
+    assert shuffled == expected